@@ -0,0 +1,70 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from directory_tree_generator import DirectoryTreeGenerator
+
+
+def make_tree(root, breadth, depth, files):
+    directories = [Path(root)]
+    created = []
+    for _ in range(depth):
+        directories = [parent / f"dir{index}" for parent in directories for index in range(breadth)]
+        for directory in directories:
+            directory.mkdir()
+            for index in range(files):
+                (directory / f"file{index}.txt").write_bytes(b"x" * index)
+        created.extend(directories)
+    settled = time.time() - 60
+    for directory in [Path(root)] + created:
+        os.utime(directory, (settled, settled))
+
+
+def slow_scandir(latency):
+    scandir = os.scandir
+
+    def scan(path):
+        time.sleep(latency)
+        return scandir(path)
+
+    return scan
+
+
+def walk(root, walk_mode, snapshot_file):
+    generator = DirectoryTreeGenerator()
+    generator.set_options(walk_mode=walk_mode, show_metadata=True, snapshot_file=snapshot_file)
+    started = time.perf_counter()
+    lines = generator.build_tree(root)
+    return lines, generator.get_summary(), time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cold and warm walks with the snapshot cache.")
+    parser.add_argument("--breadth", type=int, default=6, help="subdirectories per directory in the generated tree")
+    parser.add_argument("--depth", type=int, default=4, help="levels in the generated tree")
+    parser.add_argument("--files", type=int, default=20, help="files per directory in the generated tree")
+    parser.add_argument("--latency", type=float, default=0.002, help="seconds added to every directory listing")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = os.path.join(temp_dir, "tree")
+        os.mkdir(root)
+        make_tree(root, args.breadth, args.depth, args.files)
+        os.scandir = slow_scandir(args.latency)
+        for walk_mode in ("recursive", "iterative", "parallel"):
+            snapshot_file = os.path.join(temp_dir, f"{walk_mode}.json")
+            uncached_lines, uncached_summary, _ = walk(root, walk_mode, None)
+            _, _, cold = walk(root, walk_mode, snapshot_file)
+            lines, summary, warm = walk(root, walk_mode, snapshot_file)
+            cache_ratio = summary.pop("snapshot_cache")
+            print(f"{walk_mode}: cold {cold:.2f}s, warm {warm:.2f}s, hit ratio {cache_ratio}, "
+                  f"matches uncached walk: {lines == uncached_lines and summary == uncached_summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPT = ROOT / "directory_tree_generator.py"
+
+
+def make_tree(root, breadth, files):
+    for branch in range(breadth):
+        for leaf in range(breadth):
+            directory = Path(root) / f"dir{branch}" / f"sub{leaf}"
+            directory.mkdir(parents=True)
+            for index in range(files):
+                (directory / f"file{index}.txt").write_text("x")
+
+
+def median_time(command, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time module import, --help and a headless console run.")
+    parser.add_argument("--runs", type=int, default=15, help="runs per command, the median is reported")
+    parser.add_argument("--breadth", type=int, default=6, help="directories per level in the generated tree")
+    parser.add_argument("--files", type=int, default=17, help="files per leaf directory in the generated tree")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        make_tree(temp_dir, args.breadth, args.files)
+        commands = {
+            "python startup": [sys.executable, "-c", "pass"],
+            "import module": [sys.executable, "-c", "import directory_tree_generator"],
+            "--help": [sys.executable, str(SCRIPT), "--help"],
+            "console run": [sys.executable, str(SCRIPT), temp_dir, "-q"],
+        }
+        for name, command in commands.items():
+            print(f"{name}: {median_time(command, args.runs) * 1000:.0f} ms")
+            
+    loaded = subprocess.run([sys.executable, "-c", "import sys, directory_tree_generator; "
+                             "print(sorted(set(sys.modules) & {'customtkinter', 'tkinter'}))"],
+                            cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    print(f"GUI modules loaded by import: {loaded}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from directory_tree_generator import DirectoryTreeGenerator
+
+
+class StatCounter:
+    def __init__(self):
+        self.calls = 0
+        self.stat = os.stat
+        self.lstat = os.lstat
+        self.scandir = os.scandir
+
+    def __enter__(self):
+        counter = self
+
+        def counted_stat(*args, **kwargs):
+            counter.calls += 1
+            return counter.stat(*args, **kwargs)
+
+        def counted_lstat(*args, **kwargs):
+            counter.calls += 1
+            return counter.lstat(*args, **kwargs)
+
+        class CountedEntry:
+            def __init__(self, entry):
+                self.entry = entry
+
+            def __getattr__(self, name):
+                return getattr(self.entry, name)
+
+            def __fspath__(self):
+                return self.entry.path
+
+            def stat(self, **kwargs):
+                counter.calls += 1
+                return self.entry.stat(**kwargs)
+
+        class CountedScandir:
+            def __init__(self, path):
+                self.iterator = counter.scandir(path)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self.iterator.close()
+
+            def __iter__(self):
+                return (CountedEntry(entry) for entry in self.iterator)
+
+        os.stat, os.lstat, os.scandir = counted_stat, counted_lstat, CountedScandir
+        return self
+
+    def __exit__(self, *exc):
+        os.stat, os.lstat, os.scandir = self.stat, self.lstat, self.scandir
+
+
+def make_tree(root, breadth, depth, files):
+    directories = [Path(root)]
+    for _ in range(depth):
+        directories = [parent / f"dir{index}" for parent in directories for index in range(breadth)]
+        for directory in directories:
+            directory.mkdir()
+            for index in range(files):
+                (directory / f"file{index}.{('py', 'txt', 'md')[index % 3]}").write_bytes(b"x" * index)
+
+
+def baseline_walk(directory, show_metadata):
+    # The Path.iterdir() walk this tool used before switching to os.scandir:
+    # is_dir() in the sort key and again in the loop, and two stat() calls per
+    # file (or stat() plus is_file() when showing metadata).
+    directory = Path(directory)
+    if not directory.exists():
+        return 0
+    directory.is_symlink()
+    directory.resolve()
+    entries = sorted(directory.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower()))
+    count = 0
+    for entry in entries:
+        count += 1
+        if show_metadata:
+            entry.stat()
+            entry.is_file()
+        if entry.is_dir():
+            count += baseline_walk(entry, show_metadata)
+        elif not show_metadata:
+            entry.stat()
+            entry.stat()
+    return count
+
+
+def measure_baseline(root, show_metadata):
+    with StatCounter() as counter:
+        started = time.perf_counter()
+        entries = baseline_walk(root, show_metadata)
+        elapsed = time.perf_counter() - started
+    return counter.calls / max(entries, 1), elapsed, entries
+
+
+def measure(root, show_metadata):
+    generator = DirectoryTreeGenerator()
+    generator.set_options(show_metadata=show_metadata)
+    with StatCounter() as counter:
+        started = time.perf_counter()
+        generator.build_tree(root)
+        elapsed = time.perf_counter() - started
+    entries = generator.total_files + generator.total_dirs
+    return counter.calls / max(entries, 1), elapsed, entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count stat calls per entry made by a directory walk.")
+    parser.add_argument("directory", nargs="?", help="tree to walk (defaults to a generated tree)")
+    parser.add_argument("--breadth", type=int, default=6, help="subdirectories per directory in the generated tree")
+    parser.add_argument("--depth", type=int, default=4, help="levels in the generated tree")
+    parser.add_argument("--files", type=int, default=25, help="files per directory in the generated tree")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = args.directory
+        if root is None:
+            root = temp_dir
+            make_tree(root, args.breadth, args.depth, args.files)
+        for show_metadata in (False, True):
+            for label, walk in (("before (iterdir)", measure_baseline), ("after (scandir)", measure)):
+                per_entry, elapsed, entries = walk(root, show_metadata)
+                print(f"metadata={show_metadata} {label}: {entries} entries, {per_entry:.2f} stat calls per entry, "
+                      f"{elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
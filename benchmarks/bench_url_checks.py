@@ -0,0 +1,106 @@
+import argparse
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from url_checker import URLChecker
+
+
+class LatencyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+            
+    def log_message(self, *args):
+        pass
+        
+    def respond(self, body):
+        with self.server.lock:
+            self.server.active += 1
+            self.server.peak = max(self.server.peak, self.server.active)
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.active -= 1
+        self.send_response(404 if "/missing" in self.path else 200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        return body
+        
+    def do_GET(self):
+        self.wfile.write(self.respond(b"<html>" + b"x" * 2000 + b"</html>"))
+        
+    def do_HEAD(self):
+        self.respond(b"")
+
+
+def start_server(latency):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LatencyHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.latency = latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def reset(servers):
+    for server in servers:
+        server.connections = server.active = server.peak = 0
+
+
+def check_sequentially(urls_info, timeout):
+    codes = {}
+    for url, *_ in urls_info:
+        try:
+            codes[url] = requests.get(url, timeout=timeout).status_code
+        except requests.RequestException:
+            codes[url] = None
+    return codes
+
+
+def check_concurrently(urls_info, max_workers, per_host_limit):
+    checker = URLChecker(max_workers=max_workers, per_host_limit=per_host_limit)
+    return {result["url"]: result["code"] for result in checker.check_urls(urls_info)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sequential and pooled link checks against local servers.")
+    parser.add_argument("--hosts", type=int, default=2, help="local servers to spread the links over")
+    parser.add_argument("--links", type=int, default=200, help="links to check")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    args = parser.parse_args()
+    
+    servers = [start_server(args.latency) for _ in range(args.hosts)]
+    urls_info = []
+    for index in range(args.links):
+        port = servers[index % len(servers)].server_address[1]
+        path = "missing" if index % 10 == 0 else "page"
+        urls_info.append((f"http://127.0.0.1:{port}/{path}{index}", f"link {index}", "", ""))
+        
+    runs = [("sequential requests.get", lambda: check_sequentially(urls_info, 10))]
+    for max_workers, per_host_limit in ((16, 4), (32, 16)):
+        runs.append((f"pool, {max_workers} workers / {per_host_limit} per host",
+                     lambda w=max_workers, h=per_host_limit: check_concurrently(urls_info, w, h)))
+        
+    baseline = None
+    for name, run in runs:
+        reset(servers)
+        started = time.perf_counter()
+        codes = run()
+        elapsed = time.perf_counter() - started
+        baseline = codes if baseline is None else baseline
+        print(f"{name}: {elapsed:.2f}s, {sum(server.connections for server in servers)} TCP connections, "
+              f"peak per host {max(server.peak for server in servers)}, same codes: {codes == baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,25 @@
+import argparse
+import hashlib
+import heapq
+import html
+import json
 import logging
+import math
+import mmap
+import os
+import queue
+import re
+import shutil
+import stat
+import struct
 import sys
+import tempfile
 import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-import customtkinter as ctk
-from tkinter import StringVar, BooleanVar
-from tkinter.filedialog import askdirectory
-from tkinter.messagebox import showerror
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,6 +30,263 @@ logging.basicConfig(
 )
 logger = logging.getLogger('directory_tree')
 
+SNAPSHOT_VERSION = 1
+HASH_CACHE_VERSION = 1
+HASH_BLOCK_SIZE = 64 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+HASH_MMAP_THRESHOLD = 16 * 1024 * 1024
+HASH_POOL_THRESHOLD = 32
+INOTIFY_EVENT = struct.Struct('iIII')
+INOTIFY_MASK = 0x2 | 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200 | 0x400 | 0x800
+INOTIFY_OVERFLOW = 0x4000
+INOTIFY_IGNORED = 0x8000
+
+RECORD_TYPES = ("dir", "file", "symlink", "error")
+COLUMNAR_MAGIC = b"DTREECOL"
+COLUMNAR_VERSION = 1
+COLUMNAR_HEADER = struct.Struct('<8sIIQ')
+COLUMNAR_COLUMN = struct.Struct('<16s4sQQ')
+COLUMNAR_LAYOUT = [
+    ("depth", "<u2", "H"),
+    ("type", "|u1", "B"),
+    ("last", "|u1", "B"),
+    ("size", "<i8", "q"),
+    ("mtime", "<f8", "d"),
+    ("path_offsets", "<u8", "Q"),
+    ("path_data", "|S1", None),
+    ("error_offsets", "<u8", "Q"),
+    ("error_data", "|S1", None),
+    ("target_offsets", "<u8", "Q"),
+    ("target_data", "|S1", None),
+    ("duplicate_group", "<i4", "i"),
+]
+
+
+def hash_file(path, size, partial):
+    hasher = hashlib.blake2b(digest_size=20)
+    try:
+        with open(path, 'rb') as f:
+            if partial:
+                hasher.update(f.read(HASH_BLOCK_SIZE))
+                if size > HASH_BLOCK_SIZE:
+                    f.seek(max(size - HASH_BLOCK_SIZE, HASH_BLOCK_SIZE))
+                    hasher.update(f.read(HASH_BLOCK_SIZE))
+            elif size >= HASH_MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if hasattr(mapped, 'madvise'):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    hasher.update(mapped)
+            else:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                    hasher.update(chunk)
+    except (OSError, ValueError):
+        return None
+    return hasher.hexdigest()
+
+
+class WalkCancelled(Exception):
+    pass
+
+
+class SnapshotEntry:
+    def __init__(self, directory, record):
+        self.name, self.dir_flag, self.symlink_flag, self.size, self.mtime, self.mode = record
+        self.path = os.path.join(directory, self.name)
+
+    def is_dir(self):
+        return self.dir_flag
+
+    def is_symlink(self):
+        return self.symlink_flag
+
+    def stat(self):
+        if self.mode is None:
+            raise OSError(f"No stat result recorded for {self.path}")
+        return os.stat_result((self.mode, 0, 0, 0, 0, 0, self.size, 0, self.mtime, 0))
+
+    def __fspath__(self):
+        return self.path
+
+
+class IgnoreRules:
+    def __init__(self, patterns, base=''):
+        self.base = base
+        self.names = set()
+        self.ordered_rules = []
+        self.has_negation = False
+        name_sources = []
+        path_sources = []
+
+        for pattern in patterns:
+            rule = self.parse_pattern(pattern)
+            if rule is None:
+                continue
+            negate, anchored, literal, source = rule
+            self.ordered_rules.append((negate, anchored, re.compile(source)))
+            if negate:
+                self.has_negation = True
+            elif literal is not None:
+                self.names.add(literal)
+            elif anchored:
+                path_sources.append(source)
+            else:
+                name_sources.append(source)
+
+        self.name_regex = self.combine(name_sources)
+        self.path_regex = self.combine(path_sources)
+        if self.has_negation:
+            self.needs_path = any(anchored for _, anchored, _ in self.ordered_rules)
+        else:
+            self.needs_path = self.path_regex is not None
+
+    def combine(self, sources):
+        if not sources:
+            return None
+        return re.compile('|'.join(f"(?:{source})" for source in sources))
+
+    def parse_pattern(self, pattern):
+        line = pattern.rstrip('\r\n')
+        stripped = line.rstrip(' ')
+        if stripped.endswith('\\') and len(stripped) < len(line):
+            stripped += ' '
+        line = stripped
+        if not line or line.startswith('#'):
+            return None
+
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            return None
+
+        anchored = '/' in line
+        line = line.lstrip('/')
+        literal = None
+        if not anchored and not any(c in line for c in '*?[\\'):
+            literal = f"{line}/" if dir_only else line
+        source = self.translate(line) + ('/' if dir_only else '/?')
+        return negate, anchored, literal, source
+
+    def translate(self, pattern):
+        parts = []
+        index, length = 0, len(pattern)
+        while index < length:
+            char = pattern[index]
+            if char == '*':
+                if pattern.startswith('**', index):
+                    at_start = index == 0 or pattern[index - 1] == '/'
+                    if at_start and index + 2 == length:
+                        parts.append('.+')
+                        index += 2
+                        continue
+                    if at_start and pattern[index + 2] == '/':
+                        parts.append('(?:.*/)?')
+                        index += 3
+                        continue
+                    index += 1
+                parts.append('[^/]*')
+            elif char == '?':
+                parts.append('[^/]')
+            elif char == '[':
+                end = index + 1
+                if end < length and pattern[end] in '!^':
+                    end += 1
+                if end < length and pattern[end] == ']':
+                    end += 1
+                end = pattern.find(']', end)
+                if end == -1:
+                    parts.append('\\[')
+                else:
+                    content = pattern[index + 1:end].replace('\\', '\\\\')
+                    if content[0] in '!^':
+                        content = '^' + content[1:]
+                    parts.append(f"[{content}]")
+                    index = end
+            elif char == '\\' and index + 1 < length:
+                index += 1
+                parts.append(re.escape(pattern[index]))
+            else:
+                parts.append(re.escape(char))
+            index += 1
+        return ''.join(parts)
+
+    def match(self, name, rel_path, is_dir):
+        suffix = '/' if is_dir else ''
+        if self.base and self.needs_path:
+            rel_path = rel_path[len(self.base) + 1:]
+
+        if self.has_negation:
+            for negate, anchored, regex in reversed(self.ordered_rules):
+                if regex.fullmatch((rel_path if anchored else name) + suffix):
+                    return not negate
+            return None
+
+        if name in self.names or (is_dir and f"{name}/" in self.names):
+            return True
+        if self.name_regex is not None and self.name_regex.fullmatch(name + suffix):
+            return True
+        if self.path_regex is not None and self.path_regex.fullmatch(rel_path + suffix):
+            return True
+        return None
+
+
+class TreeColumns:
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, column_count, self.count = COLUMNAR_HEADER.unpack_from(self.map, 0)
+        if magic != COLUMNAR_MAGIC or version != COLUMNAR_VERSION:
+            self.close()
+            raise ValueError(f"Not a columnar directory tree file: {path}")
+            
+        formats = {dtype: code for _, dtype, code in COLUMNAR_LAYOUT}
+        self.columns = {}
+        for index in range(column_count):
+            name, dtype, offset, length = COLUMNAR_COLUMN.unpack_from(
+                self.map, COLUMNAR_HEADER.size + index * COLUMNAR_COLUMN.size)
+            view = memoryview(self.map)[offset:offset + length]
+            code = formats.get(dtype.rstrip(b'\0').decode())
+            self.columns[name.rstrip(b'\0').decode()] = view.cast(code) if code else view
+
+    def __len__(self):
+        return self.count
+
+    def string(self, column, index):
+        offsets = self.columns[f"{column}_offsets"]
+        start, end = offsets[index], offsets[index + 1]
+        if start == end:
+            return None
+        return bytes(self.columns[f"{column}_data"][start:end]).decode('utf-8', 'surrogateescape')
+
+    def record(self, index):
+        path = self.string("path", index)
+        size = self.columns["size"][index]
+        mtime = self.columns["mtime"][index]
+        record = {"path": path, "name": os.path.basename(path), "depth": self.columns["depth"][index],
+                  "type": RECORD_TYPES[self.columns["type"][index]], "size": size if size >= 0 else None,
+                  "mtime": None if math.isnan(mtime) else mtime, "error": self.string("error", index),
+                  "last": bool(self.columns["last"][index])}
+        target = self.string("target", index)
+        if target is not None:
+            record["target"] = target
+        group = self.columns.get("duplicate_group")
+        if group is not None and group[index] >= 0:
+            record["duplicate_group"] = group[index]
+        return record
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.record(index)
+
+    def close(self):
+        for view in self.columns.values():
+            view.release()
+        self.columns = {}
+        self.map.close()
+        self.file.close()
+
 
 class DirectoryTreeGenerator:    
     def __init__(self):
@@ -24,6 +294,38 @@ class DirectoryTreeGenerator:
         self.show_metadata = False
         self.follow_symlinks = False
         self.file_filter = None
+        self.include_patterns = []
+        self.use_gitignore = False
+        self.exclude_rules = None
+        self.include_rules = None
+        self.pending_rules = {}
+        self.directory_rules = None
+        self.walk_mode = "recursive"
+        self.max_depth = None
+        self.max_workers = 8
+        self.snapshot_file = None
+        self.snapshot = None
+        self.next_snapshot = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_lock = threading.Lock()
+        self.cancel_event = threading.Event()
+        self.diff_counts = {"+": 0, "-": 0, "~": 0}
+        self.find_duplicates = False
+        self.hash_cache_file = None
+        self.hash_workers = None
+        self.hash_cache = {}
+        self.next_hash_cache = {}
+        self.size_groups = {}
+        self.duplicate_groups = []
+        self.records_emitted = 0
+        self.hashed_files = 0
+        self.hash_cache_hits = 0
+        self.top_n = 10
+        self.rollup_root = ""
+        self.rollup_stack = []
+        self.heaviest_dirs = []
+        self.largest_files = []
         self.visited_paths = set()
         self.total_files = 0
         self.total_dirs = 0
@@ -39,137 +341,898 @@ class DirectoryTreeGenerator:
         self.file_types = {}
         self.largest_file = ("", 0)
         self.newest_file = ("", datetime.min)
+        self.visited_paths = set()
+        self.pending_rules = {}
+        self.size_groups = {}
+        self.duplicate_groups = []
+        self.records_emitted = 0
+        self.hashed_files = 0
+        self.hash_cache_hits = 0
+        self.reset_rollups()
+
+    def reset_rollups(self):
+        self.heaviest_dirs = []
+        self.largest_files = []
 
-    def set_options(self, excluded_items=None, show_metadata=False, follow_symlinks=False, file_filter=None):
+    def set_options(self, excluded_items=None, show_metadata=False, follow_symlinks=False, file_filter=None,
+                    walk_mode="recursive", max_depth=None, max_workers=8, snapshot_file=None,
+                    include_patterns=None, use_gitignore=False, find_duplicates=False, hash_cache_file=None,
+                    hash_workers=None, top_n=10):
         self.excluded_items = excluded_items or []
+        self.include_patterns = include_patterns or []
+        self.use_gitignore = use_gitignore
+        self.exclude_rules = IgnoreRules(self.excluded_items) if self.excluded_items else None
+        self.include_rules = IgnoreRules(self.include_patterns) if self.include_patterns else None
         self.show_metadata = show_metadata
         self.follow_symlinks = follow_symlinks
         self.file_filter = file_filter
+        self.walk_mode = walk_mode
+        self.max_depth = max_depth
+        self.max_workers = max_workers
+        self.snapshot_file = snapshot_file
+        self.find_duplicates = find_duplicates
+        self.hash_cache_file = hash_cache_file
+        self.hash_workers = hash_workers
+        self.top_n = top_n
         self.reset_stats()
 
-    def get_metadata(self, path):
-        try:
-            stats = path.stat()
-            size = stats.st_size
-            modified = datetime.fromtimestamp(stats.st_mtime)
-            modified_str = modified.strftime('%Y-%m-%d %H:%M')
-            
-            if size < 1024:
-                size_str = f"{size} bytes"
-            elif size < 1024 * 1024:
-                size_str = f"{size/1024:.1f} KB"
-            else:
-                size_str = f"{size/(1024*1024):.1f} MB"
+    def get_suffix(self, name):
+        index = name.rfind('.')
+        if 0 < index < len(name) - 1:
+            return name[index:]
+        return ''
+
+    def record_file(self, path, size=None, modified=None):
+        self.total_files += 1
+
+        suffix = self.get_suffix(path.name).lower()
+        if suffix:
+            self.file_types[suffix] = self.file_types.get(suffix, 0) + 1
+        else:
+            self.file_types["no_extension"] = self.file_types.get("no_extension", 0) + 1
+
+        if size is None:
+            return
+
+        self.total_size += size
+        if size > self.largest_file[1]:
+            self.largest_file = (os.fspath(path), size)
+
+        if modified > self.newest_file[1]:
+            self.newest_file = (os.fspath(path), modified)
+
+    def forget_record(self, record):
+        if record["type"] == "dir":
+            self.total_dirs -= 1
+            return
             
-            if path.is_file():
-                self.total_files += 1
-                self.total_size += size
-                
-                suffix = path.suffix.lower()
-                if suffix:
-                    self.file_types[suffix] = self.file_types.get(suffix, 0) + 1
-                else:
-                    self.file_types["no_extension"] = self.file_types.get("no_extension", 0) + 1
-                
-                if size > self.largest_file[1]:
-                    self.largest_file = (str(path), size)
-                
-                if modified > self.newest_file[1]:
-                    self.newest_file = (str(path), modified)
-            elif path.is_dir():
-                self.total_dirs += 1
-                
-            return f"[{size_str}, modified: {modified_str}]"
-        except Exception as e:
-            logger.error(f"Error getting metadata for {path}: {e}")
+        self.total_files -= 1
+        suffix = self.get_suffix(record["name"]).lower() or "no_extension"
+        self.file_types[suffix] -= 1
+        if not self.file_types[suffix]:
+            del self.file_types[suffix]
+        if record["size"] is not None:
+            self.total_size -= record["size"]
+
+    def format_metadata(self, record):
+        if record["size"] is None:
             return "[error reading metadata]"
+            
+        size = record["size"]
+        modified_str = datetime.fromtimestamp(record["mtime"]).strftime('%Y-%m-%d %H:%M')
+        
+        if size < 1024:
+            size_str = f"{size} bytes"
+        elif size < 1024 * 1024:
+            size_str = f"{size/1024:.1f} KB"
+        else:
+            size_str = f"{size/(1024*1024):.1f} MB"
+            
+        return f"[{size_str}, modified: {modified_str}]"
 
-    def matches_filter(self, path):
+    def matches_filter(self, path, is_dir=None):
         if not self.file_filter:
             return True
             
-        if path.is_dir():
+        if is_dir is None:
+            is_dir = path.is_dir()
+        if is_dir:
             return True
             
-        return path.suffix.lower() in self.file_filter
+        return self.get_suffix(path.name).lower() in self.file_filter
+
+    def load_snapshot(self):
+        self.snapshot = None
+        self.next_snapshot = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        if not self.snapshot_file:
+            return
+            
+        self.snapshot = {}
+        try:
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == SNAPSHOT_VERSION:
+                self.snapshot = data["directories"]
+            else:
+                logger.warning(f"Ignoring snapshot with unsupported version: {self.snapshot_file}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable snapshot {self.snapshot_file}: {e}")
+
+    def save_snapshot(self):
+        if self.snapshot is None:
+            return
+            
+        try:
+            self.write_listings(self.snapshot_file, self.next_snapshot)
+            logger.info(f"Snapshot saved to {self.snapshot_file} ({self.get_cache_ratio()})")
+        except Exception as e:
+            logger.error(f"Error saving snapshot {self.snapshot_file}: {e}")
+
+    def write_listings(self, snapshot_file, listings):
+        temp_file = f"{snapshot_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({"version": SNAPSHOT_VERSION, "directories": listings}, f, separators=(',', ':'))
+        os.replace(temp_file, snapshot_file)
+
+    def get_cache_ratio(self):
+        total = self.cache_hits + self.cache_misses
+        ratio = self.cache_hits / total * 100 if total else 0
+        return f"{self.cache_hits} of {total} directories served from cache ({ratio:.1f}%)"
+
+    def snapshot_record(self, entry):
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        try:
+            stats = entry.stat()
+            return [entry.name, is_dir, entry.is_symlink(), stats.st_size, stats.st_mtime, stats.st_mode]
+        except OSError:
+            return [entry.name, is_dir, entry.is_symlink(), None, None, None]
+
+    def list_directory(self, directory):
+        if self.snapshot is None:
+            with os.scandir(directory) as iterator:
+                return list(iterator)
+                
+        key = os.path.abspath(directory)
+        mtime_ns = os.stat(directory).st_mtime_ns
+        cached = self.snapshot.get(key)
+        if cached is not None and cached[0] == mtime_ns:
+            records = cached[1]
+            with self.cache_lock:
+                self.cache_hits += 1
+        else:
+            with os.scandir(directory) as iterator:
+                records = [self.snapshot_record(entry) for entry in iterator]
+            with self.cache_lock:
+                self.cache_misses += 1
+                
+        if time.time_ns() - mtime_ns > 2 * 10**9:
+            self.next_snapshot[key] = [mtime_ns, records]
+        return [SnapshotEntry(directory, record) for record in records]
+
+    def load_gitignore(self, path, base):
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                return IgnoreRules(f.read().splitlines(), base)
+        except OSError as e:
+            logger.warning(f"Could not read {path}: {e}")
+            return None
+
+    def is_excluded(self, rule_chain, name, rel_path, is_dir):
+        for rules in reversed(rule_chain):
+            result = rules.match(name, rel_path, is_dir)
+            if result is not None:
+                return result
+        return False
+
+    def is_included(self, name, rel_path, is_dir):
+        if is_dir or self.include_rules is None:
+            return True
+        return self.include_rules.match(name, rel_path, False) is True
+
+    def scan_directory(self, directory):
+        default_chain = [self.exclude_rules] if self.exclude_rules else []
+        rel_dir, rule_chain = self.pending_rules.pop(os.fspath(directory), ('', default_chain))
+        if self.directory_rules is not None:
+            self.directory_rules[os.fspath(directory)] = (rel_dir, rule_chain)
+        listing = self.list_directory(directory)
+        
+        if self.use_gitignore:
+            for entry in listing:
+                if entry.name == '.gitignore':
+                    rules = self.load_gitignore(entry.path, rel_dir)
+                    if rules is not None:
+                        rule_chain = rule_chain + [rules]
+                    break
+                    
+        entries = []
+        for entry in listing:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            if rule_chain and self.is_excluded(rule_chain, entry.name, rel_path, is_dir):
+                continue
+            if not self.is_included(entry.name, rel_path, is_dir) or not self.matches_filter(entry, is_dir):
+                continue
+            entries.append((entry, is_dir))
+            if is_dir:
+                self.pending_rules[entry.path] = (rel_path, rule_chain)
+                
+        entries.sort(key=lambda item: (not item[1], item[0].name.lower()))
+        return entries
+
+    def prefetch_directory(self, directory):
+        entries = self.scan_directory(directory)
+        for entry, is_dir in entries:
+            if self.show_metadata or not is_dir:
+                try:
+                    entry.stat()
+                except OSError:
+                    pass
+        return entries
 
-    def generate_tree(self, directory, indent='', connector='', output_lines=None):
-        if output_lines is None:
-            output_lines = []
-            self.reset_stats()
+    def prefetch_children(self, entries, start, pending, depth, max_depth, executor):
+        if executor is None or (max_depth is not None and depth >= max_depth):
+            return len(entries)
+        window = 2 * self.max_workers
+        index = start
+        while index < len(entries) and len(pending) < window:
+            entry, is_dir = entries[index]
+            if is_dir and not entry.is_symlink():
+                pending[entry.path] = executor.submit(self.prefetch_directory, entry.path)
+            index += 1
+        return index
+
+    def make_record(self, entry, is_dir, depth, is_last):
+        record = {"path": entry.path, "name": entry.name, "depth": depth, "type": "dir" if is_dir else "file",
+                  "size": None, "mtime": None, "error": None, "last": is_last}
+        if not self.show_metadata and is_dir:
+            self.total_dirs += 1
+            return record
+            
+        try:
+            stats = entry.stat()
+            modified = datetime.fromtimestamp(stats.st_mtime)
+            record["size"] = stats.st_size
+            record["mtime"] = stats.st_mtime
+        except Exception as e:
+            record["error"] = str(e)
+            if self.show_metadata:
+                logger.error(f"Error getting metadata for {entry.path}: {e}")
+            else:
+                self.record_file(entry)
+            return record
+            
+        if not self.show_metadata:
+            self.record_file(entry, stats.st_size, modified)
+        elif stat.S_ISREG(stats.st_mode):
+            self.record_file(entry, stats.st_size, modified)
+        elif stat.S_ISDIR(stats.st_mode):
+            self.total_dirs += 1
             
+        if self.find_duplicates and stats.st_size and stat.S_ISREG(stats.st_mode):
+            self.size_groups.setdefault(stats.st_size, []).append((entry.path, self.records_emitted))
+        return record
+
+    def make_note(self, path, name, depth, is_last, note_type, error=None, target=None):
+        record = {"path": os.fspath(path), "name": name, "depth": depth, "type": note_type,
+                  "size": None, "mtime": None, "error": error, "last": is_last}
+        if target is not None:
+            record["target"] = target
+        return record
+
+    def check_symlink(self, path):
+        resolved_path = os.path.realpath(path)
+        if resolved_path in self.visited_paths:
+            return resolved_path, "symlink loop detected"
+        if not self.follow_symlinks:
+            return resolved_path, "symlink"
+        return resolved_path, None
+
+    def enter_directory(self, entry, parent_resolved):
+        if entry.is_symlink():
+            return self.check_symlink(entry.path)
+        return os.path.join(parent_resolved, entry.name), None
+
+    def open_directory(self, path, name, depth, is_last, notes, pending=None):
+        try:
+            if pending is not None:
+                return pending.result()
+            return self.scan_directory(path)
+        except PermissionError:
+            logger.warning(f"Permission denied: {os.fspath(path)}")
+            notes.append(self.make_note(path, name, depth, is_last, "error", "permission denied"))
+        except Exception as e:
+            logger.error(f"Error accessing directory {os.fspath(path)}: {e}")
+            notes.append(self.make_note(path, name, depth, is_last, "error", f"error: {str(e)}"))
+        return None
+
+    def open_root(self, directory, notes):
         directory = Path(directory)
         if not directory.exists():
             logger.error(f"Directory does not exist: {directory}")
-            return output_lines
+            return directory, None
             
         if directory.is_symlink():
-            resolved_path = directory.resolve()
-            if resolved_path in self.visited_paths:
-                output_lines.append(f"{indent}{connector}{directory.name}/ -> {resolved_path} [symlink loop detected]")
-                return output_lines
-            if not self.follow_symlinks:
-                output_lines.append(f"{indent}{connector}{directory.name}/ -> {resolved_path} [symlink]")
-                return output_lines
-                
-        self.visited_paths.add(directory.resolve())
-        
+            resolved_path, status = self.check_symlink(directory)
+            if status:
+                notes.append(self.make_note(directory, directory.name, 0, True, "symlink",
+                                            status if status != "symlink" else None, resolved_path))
+                return directory, None
+        else:
+            resolved_path = os.path.realpath(directory)
+            
+        self.visited_paths.add(resolved_path)
+        return directory, resolved_path
+
+    def symlink_note(self, entry, depth, is_last, status, target):
+        return self.make_note(entry.path, entry.name, depth, is_last, "symlink",
+                              status if status != "symlink" else None, target)
+
+    def build_tree(self, directory):
+        return list(self.stream_tree(directory))
+
+    def stream_tree(self, directory):
+        return self.render_lines(self.stream_records(directory))
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def get_progress(self):
+        return self.total_files + self.total_dirs, len(self.pending_rules)
+
+    def stream_records(self, directory):
+        self.load_snapshot()
+        if self.walk_mode == "parallel":
+            executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            try:
+                yield from self.track_records(directory, self.iter_records(directory, self.max_depth, executor))
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+        elif self.walk_mode == "iterative" or self.max_depth is not None:
+            yield from self.track_records(directory, self.iter_records(directory, self.max_depth))
+        else:
+            yield from self.track_records(directory, self.walk_records(directory))
+        self.save_snapshot()
+        if self.find_duplicates:
+            self.find_duplicate_groups()
+
+    def track_records(self, directory, records):
+        self.rollup_root = os.fspath(directory)
+        self.rollup_stack = [[0, self.rollup_root, 0, 0, False]]
+        for record in records:
+            if self.cancel_event.is_set():
+                logger.info("Directory walk cancelled")
+                raise WalkCancelled("walk cancelled")
+            self.rollup_record(record)
+            yield record
+            self.records_emitted += 1
+        while self.rollup_stack:
+            self.close_rollup()
+
+    def rollup_record(self, record):
+        depth = record["depth"]
+        while self.rollup_stack and self.rollup_stack[-1][0] >= depth:
+            self.close_rollup()
+            
+        if record["type"] in ("dir", "file") and self.rollup_stack:
+            self.rollup_stack[-1][4] = True
+        if record["type"] == "dir":
+            self.rollup_stack.append([depth, record["path"], 0, 0, False])
+        elif record["type"] == "file" and record["size"] is not None and self.rollup_stack:
+            frame = self.rollup_stack[-1]
+            frame[2] += record["size"]
+            frame[3] += 1
+            self.push_bounded(self.largest_files, (record["size"], record["path"]))
+
+    def close_rollup(self):
+        _, path, size, files, entered = self.rollup_stack.pop()
+        if self.rollup_stack:
+            parent = self.rollup_stack[-1]
+            parent[2] += size
+            parent[3] += files
+            if entered:
+                self.push_bounded(self.heaviest_dirs, (size, files, path))
+
+    def push_bounded(self, heap, item):
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    def relative_path(self, path):
+        relative = os.path.relpath(path, self.rollup_root) if self.rollup_root else path
+        return relative.replace(os.sep, '/')
+
+    def get_heaviest_directories(self):
+        return [(self.relative_path(path), size, files) for size, files, path in sorted(self.heaviest_dirs, reverse=True)]
+
+    def get_largest_files(self):
+        return [(self.relative_path(path), size) for size, path in sorted(self.largest_files, reverse=True)]
+
+    def load_hash_cache(self):
+        self.hash_cache = {}
+        self.next_hash_cache = {}
+        if not self.hash_cache_file:
+            return
+            
         try:
-            entries = [entry for entry in directory.iterdir() 
-                      if entry.name not in self.excluded_items and self.matches_filter(entry)]
-        except PermissionError:
-            logger.warning(f"Permission denied: {directory}")
-            output_lines.append(f"{indent}{connector}{directory.name}/ [permission denied]")
-            return output_lines
+            with open(self.hash_cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == HASH_CACHE_VERSION:
+                self.hash_cache = data["files"]
+            else:
+                logger.warning(f"Ignoring hash cache with unsupported version: {self.hash_cache_file}")
+        except FileNotFoundError:
+            pass
         except Exception as e:
-            logger.error(f"Error accessing directory {directory}: {e}")
-            output_lines.append(f"{indent}{connector}{directory.name}/ [error: {str(e)}]")
-            return output_lines
+            logger.warning(f"Ignoring unreadable hash cache {self.hash_cache_file}: {e}")
+
+    def save_hash_cache(self):
+        if not self.hash_cache_file:
+            return
+            
+        try:
+            temp_file = f"{self.hash_cache_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({"version": HASH_CACHE_VERSION, "files": self.next_hash_cache}, f, separators=(',', ':'))
+            os.replace(temp_file, self.hash_cache_file)
+            logger.info(f"Hash cache saved to {self.hash_cache_file} ({len(self.next_hash_cache)} files)")
+        except Exception as e:
+            logger.error(f"Error saving hash cache {self.hash_cache_file}: {e}")
+
+    def find_duplicate_groups(self):
+        self.load_hash_cache()
+        candidates = self.duplicate_candidates()
+        executor = None
+        if self.hash_workers != 0 and len(candidates) >= HASH_POOL_THRESHOLD:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=self.hash_workers)
+        try:
+            self.duplicate_groups = []
+            full_candidates = []
+            for (size, digest), files in self.group_by_hash(candidates, True, executor).items():
+                if len(files) < 2:
+                    continue
+                if size <= 2 * HASH_BLOCK_SIZE:
+                    self.duplicate_groups.append((size, digest, files))
+                else:
+                    full_candidates.extend(files)
+                    
+            for (size, digest), files in self.group_by_hash(full_candidates, False, executor).items():
+                if len(files) > 1:
+                    self.duplicate_groups.append((size, digest, files))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+                
+        self.duplicate_groups.sort(key=lambda group: (-group[0] * (len(group[2]) - 1), group[2][0][1]))
+        self.save_hash_cache()
+        logger.info(f"Duplicate scan: {self.get_duplicate_summary()}")
+
+    def duplicate_candidates(self):
+        candidates = []
+        for size, files in self.size_groups.items():
+            if len(files) < 2:
+                continue
+            seen_inodes = set()
+            for path, row in files:
+                try:
+                    stats = os.stat(path)
+                except OSError:
+                    continue
+                if stats.st_size != size or (stats.st_dev, stats.st_ino) in seen_inodes:
+                    continue
+                seen_inodes.add((stats.st_dev, stats.st_ino))
+                candidates.append((size, path, row, f"{stats.st_dev}:{stats.st_ino}:{size}:{stats.st_mtime_ns}"))
+        self.size_groups = {}
+        return candidates
+
+    def group_by_hash(self, files, partial, executor=None):
+        slot = 0 if partial else 1
+        digests = {}
+        pending = []
+        for item in files:
+            cached = self.hash_cache.get(item[3])
+            if cached is not None and cached[slot] is not None:
+                digests[item[3]] = cached[slot]
+                self.hash_cache_hits += 1
+            else:
+                pending.append(item)
+        self.hash_pending(pending, partial, digests, executor)
+            
+        groups = {}
+        for item in files:
+            digest = digests.get(item[3])
+            if digest is None:
+                continue
+            entry = self.next_hash_cache.setdefault(item[3], list(self.hash_cache.get(item[3], [None, None])))
+            entry[slot] = digest
+            groups.setdefault((item[0], digest), []).append(item)
+        return groups
+
+    def hash_pending(self, pending, partial, digests, executor=None):
+        sizes = [item[0] for item in pending]
+        paths = [item[1] for item in pending]
+        if executor is not None and len(pending) > 1:
+            chunk_size = max(1, min(64, len(pending) // 32))
+            results = executor.map(hash_file, paths, sizes, [partial] * len(pending), chunksize=chunk_size)
+        else:
+            results = map(hash_file, paths, sizes, [partial] * len(pending))
+            
+        for item, digest in zip(pending, results):
+            if self.cancel_event.is_set():
+                logger.info("Duplicate scan cancelled")
+                raise WalkCancelled("duplicate scan cancelled")
+            self.hashed_files += 1
+            if digest is None:
+                logger.warning(f"Could not hash {item[1]}")
+                continue
+            digests[item[3]] = digest
+
+    def format_size(self, size):
+        if size < 1024:
+            return f"{size} bytes"
+        elif size < 1024 * 1024:
+            return f"{size/1024:.1f} KB"
+        elif size < 1024 * 1024 * 1024:
+            return f"{size/(1024*1024):.1f} MB"
+        return f"{size/(1024*1024*1024):.2f} GB"
+
+    def get_duplicate_summary(self):
+        files = sum(len(group[2]) for group in self.duplicate_groups)
+        wasted = sum(size * (len(paths) - 1) for size, _, paths in self.duplicate_groups)
+        return (f"{len(self.duplicate_groups)} groups, {files} files, {self.format_size(wasted)} reclaimable "
+                f"({self.hash_cache_hits} of {self.hash_cache_hits + self.hashed_files} hashes from cache)")
+
+    def duplicate_lines(self):
+        for size, digest, files in self.duplicate_groups:
+            yield f"{self.format_size(size)} x {len(files)} [{digest[:16]}]"
+            for item in files:
+                yield f"    {item[1]}"
+
+    def generate_tree(self, directory):
+        return list(self.render_lines(self.walk_records(directory)))
+
+    def walk_records(self, directory):
+        notes = []
+        self.reset_stats()
+        
+        directory, resolved_path = self.open_root(directory, notes)
+        if resolved_path is None:
+            yield from notes
+            return
+            
+        entries = self.open_directory(directory, directory.name, 0, True, notes)
+        if entries is None:
+            yield from notes
+            return
+            
+        yield from self.walk_entries(entries, resolved_path, 0)
+
+    def walk_directory(self, path, name, resolved_path, depth, is_last):
+        notes = []
+        entries = self.open_directory(path, name, depth + 1, is_last, notes)
+        if entries is None:
+            yield from notes
+            return
             
-        entries = sorted(entries, key=lambda x: (not x.is_dir(), x.name.lower()))
+        yield from self.walk_entries(entries, resolved_path, depth)
+
+    def walk_entries(self, entries, resolved_path, depth):
+        for index, (entry, is_dir) in enumerate(entries):
+            entry_last = (index == len(entries) - 1)
+            yield self.make_record(entry, is_dir, depth + 1, entry_last)
+            
+            if not is_dir:
+                continue
+                
+            child_resolved, status = self.enter_directory(entry, resolved_path)
+            if status:
+                self.pending_rules.pop(entry.path, None)
+                yield self.symlink_note(entry, depth + 2, entry_last, status, child_resolved)
+                continue
+                
+            self.visited_paths.add(child_resolved)
+            yield from self.walk_directory(entry.path, entry.name, child_resolved, depth + 1, entry_last)
+
+    def iter_records(self, directory, max_depth=None, executor=None):
+        notes = []
+        self.reset_stats()
         
-        for index, entry in enumerate(entries):
+        directory, resolved_path = self.open_root(directory, notes)
+        if resolved_path is None:
+            yield from notes
+            return
+            
+        pending = executor.submit(self.prefetch_directory, directory) if executor else None
+        entries = self.open_directory(directory, directory.name, 0, True, notes, pending)
+        if entries is None:
+            yield from notes
+            return
+            
+        stack = [[entries, 0, resolved_path, 1, {}, 0]]
+        while stack:
+            frame = stack[-1]
+            entries, index, resolved_path, depth, pending, prefetched = frame
+            if index == len(entries):
+                stack.pop()
+                continue
+                
+            frame[1] = index + 1
+            frame[5] = self.prefetch_children(entries, prefetched, pending, depth, max_depth, executor)
+            entry, is_dir = entries[index]
             is_last = (index == len(entries) - 1)
-            current_connector = '└── ' if is_last else '├── '
-            new_indent = indent + ('    ' if is_last else '│   ')
+            yield self.make_record(entry, is_dir, depth, is_last)
             
-            if entry.is_dir():
-                if self.show_metadata:
-                    metadata = self.get_metadata(entry)
-                    output_lines.append(f"{indent}{current_connector}{entry.name}/ {metadata}")
-                else:
-                    output_lines.append(f"{indent}{current_connector}{entry.name}/")
-                    self.total_dirs += 1
-                    
-                self.generate_tree(entry, new_indent, '└── ' if is_last else '├── ', output_lines)
+            if not is_dir:
+                continue
+            if max_depth is not None and depth >= max_depth:
+                self.pending_rules.pop(entry.path, None)
+                continue
+                
+            future = pending.pop(entry.path, None)
+            child_resolved, status = self.enter_directory(entry, resolved_path)
+            if status:
+                self.pending_rules.pop(entry.path, None)
+                yield self.symlink_note(entry, depth + 1, is_last, status, child_resolved)
+                continue
+                
+            self.visited_paths.add(child_resolved)
+            children = self.open_directory(entry.path, entry.name, depth + 1, is_last, notes, future)
+            yield from notes
+            notes.clear()
+            if children:
+                stack.append([children, 0, child_resolved, depth + 1, {}, 0])
+
+    def load_listings(self, snapshot_file):
+        with open(snapshot_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {snapshot_file}")
+        return data["directories"]
+
+    def capture_listings(self, directory):
+        listings = {}
+        root = os.path.abspath(directory)
+        self.pending_rules = {}
+        self.visited_paths = {os.path.realpath(root)}
+        stack = [(root, 0)]
+        while stack:
+            path, depth = stack.pop()
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+                entries = self.scan_directory(path)
+            except OSError as e:
+                logger.warning(f"Error accessing directory {path}: {e}")
+                continue
+            listings[path] = [mtime_ns, [self.snapshot_record(entry) for entry, _ in entries]]
+            for entry, is_dir in entries:
+                if not is_dir:
+                    continue
+                if self.max_depth is not None and depth + 1 >= self.max_depth:
+                    self.pending_rules.pop(entry.path, None)
+                    continue
+                if entry.is_symlink():
+                    resolved_path, status = self.check_symlink(entry.path)
+                    if status:
+                        self.pending_rules.pop(entry.path, None)
+                        continue
+                    self.visited_paths.add(resolved_path)
+                stack.append((entry.path, depth + 1))
+        return listings
+
+    def diff_descends(self, record):
+        return record[1] and (not record[2] or self.follow_symlinks)
+
+    def diff_visible(self, record, rel_path):
+        name, is_dir = record[0], record[1]
+        if self.exclude_rules and self.is_excluded([self.exclude_rules], name, rel_path, is_dir):
+            return False
+        if not self.is_included(name, rel_path, is_dir):
+            return False
+        return is_dir or not self.file_filter or self.get_suffix(name).lower() in self.file_filter
+
+    def visible_listing(self, listings, path, rel_dir, ordered=True):
+        listing = listings.get(path)
+        if listing is None:
+            return None
+        entries = []
+        for record in listing[1]:
+            rel_path = f"{rel_dir}/{record[0]}" if rel_dir else record[0]
+            if self.diff_visible(record, rel_path):
+                entries.append((record[0], record, rel_path))
+        if ordered:
+            entries.sort(key=lambda item: item[0])
+        return entries
+
+    def compute_signatures(self, listings, directory):
+        signatures = {}
+        root = os.path.abspath(directory)
+        stack = [(root, '', None)]
+        while stack:
+            path, rel_dir, entries = stack.pop()
+            expanded = entries is not None
+            if not expanded:
+                entries = self.visible_listing(listings, path, rel_dir, False)
+                if entries is None:
+                    continue
+            children = [(os.path.join(path, name), rel_path) for name, record, rel_path in entries
+                        if self.diff_descends(record)]
+            if not expanded:
+                stack.append((path, rel_dir, entries))
+                stack.extend((child, rel_path, None) for child, rel_path in children)
+                continue
+                
+            size, count, stamp = 0, len(entries), hash((path, listings[path][0]))
+            for name, record, _ in entries:
+                size += record[3] or 0
+                stamp += hash((name, record[3], record[4]))
+            for child, _ in children:
+                signature = signatures.get(child)
+                if signature is None:
+                    continue
+                size += signature[0]
+                count += signature[1]
+                stamp += signature[2]
+            signatures[path] = (size, count, stamp & 0xFFFFFFFFFFFFFFFF)
+        return signatures
+
+    def diff_tree(self, directory, old_snapshot, new_snapshot=None, capture_file=None):
+        old_listings = self.load_listings(old_snapshot)
+        if new_snapshot is None:
+            new_listings = self.capture_listings(directory)
+            if capture_file:
+                self.write_listings(capture_file, new_listings)
+                logger.info(f"Snapshot of {directory} saved to {capture_file} ({len(new_listings)} directories)")
+        else:
+            new_listings = self.load_listings(new_snapshot)
+            
+        self.diff_counts = {"+": 0, "-": 0, "~": 0}
+        old_signatures = self.compute_signatures(old_listings, directory)
+        new_signatures = self.compute_signatures(new_listings, directory)
+        root = os.path.abspath(directory)
+        if old_signatures.get(root) is not None and old_signatures.get(root) == new_signatures.get(root):
+            return
+            
+        stack = [iter(self.diff_directory(root, '', 1, old_listings, new_listings, old_signatures, new_signatures))]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+            record, children = item
+            yield record
+            if children is not None:
+                stack.append(iter(children))
+
+    def diff_directory(self, path, rel_dir, depth, old_listings, new_listings, old_signatures, new_signatures):
+        old_entries = self.visible_listing(old_listings, path, rel_dir) or []
+        new_entries = self.visible_listing(new_listings, path, rel_dir) or []
+        changes = []
+        old_index = new_index = 0
+        while old_index < len(old_entries) or new_index < len(new_entries):
+            old_item = old_entries[old_index] if old_index < len(old_entries) else None
+            new_item = new_entries[new_index] if new_index < len(new_entries) else None
+            if new_item is None or (old_item is not None and old_item[0] < new_item[0]):
+                changes.append(("-", old_item, None))
+                old_index += 1
+            elif old_item is None or new_item[0] < old_item[0]:
+                changes.append(("+", None, new_item))
+                new_index += 1
             else:
-                if self.show_metadata:
-                    metadata = self.get_metadata(entry)
-                    output_lines.append(f"{indent}{current_connector}{entry.name} {metadata}")
-                else:
-                    output_lines.append(f"{indent}{current_connector}{entry.name}")
-                    self.total_files += 1
+                old_index += 1
+                new_index += 1
+                old_record, new_record = old_item[1], new_item[1]
+                if old_record[1] != new_record[1]:
+                    changes.append(("-", old_item, None))
+                    changes.append(("+", None, new_item))
+                elif self.diff_descends(new_record):
+                    child = os.path.join(path, new_item[0])
+                    if old_signatures.get(child) != new_signatures.get(child):
+                        changes.append(("~", old_item, new_item))
+                elif old_record[3] != new_record[3] or old_record[4] != new_record[4]:
+                    changes.append(("~", old_item, new_item))
                     
-                    suffix = entry.suffix.lower()
-                    if suffix:
-                        self.file_types[suffix] = self.file_types.get(suffix, 0) + 1
+        changes.sort(key=lambda change: (not (change[1] or change[2])[1][1], (change[1] or change[2])[0].lower()))
+        for index, (marker, old_item, new_item) in enumerate(changes):
+            name, record, rel_path = new_item or old_item
+            child = os.path.join(path, name)
+            is_dir = record[1]
+            diff_record = {"path": child, "name": name, "depth": depth, "type": "dir" if is_dir else "file",
+                           "size": record[3], "mtime": record[4], "error": None,
+                           "last": index == len(changes) - 1, "change": marker, "detail": None}
+            children = None
+            if marker != "~":
+                self.diff_counts[marker] += 1
+                if self.diff_descends(record):
+                    listings = new_listings if marker == "+" else old_listings
+                    children = self.diff_subtree(child, rel_path, depth + 1, marker, listings)
+            elif is_dir:
+                if old_listings.get(child) is None:
+                    diff_record["detail"] = "not in old snapshot"
+                elif new_listings.get(child) is None:
+                    diff_record["detail"] = "not in new snapshot"
+                else:
+                    if old_listings[child][0] != new_listings[child][0]:
+                        diff_record["detail"] = "touched"
+                        self.diff_counts["~"] += 1
                     else:
-                        self.file_types["no_extension"] = self.file_types.get("no_extension", 0) + 1
-                    
-                    try:
-                        size = entry.stat().st_size
-                        self.total_size += size
-                        
-                        if size > self.largest_file[1]:
-                            self.largest_file = (str(entry), size)
-                            
-                        modified = datetime.fromtimestamp(entry.stat().st_mtime)
-                        if modified > self.newest_file[1]:
-                            self.newest_file = (str(entry), modified)
-                    except:
-                        pass
-                    
-        return output_lines
+                        diff_record["change"] = " "
+                    children = self.diff_directory(child, rel_path, depth + 1, old_listings, new_listings,
+                                                   old_signatures, new_signatures)
+            else:
+                self.diff_counts["~"] += 1
+                old_record = old_item[1]
+                if old_record[3] != record[3]:
+                    old_size, new_size = self.format_size(old_record[3] or 0), self.format_size(record[3] or 0)
+                    if old_size == new_size:
+                        old_size, new_size = f"{old_record[3]} bytes", f"{record[3]} bytes"
+                    diff_record["detail"] = f"{old_size} -> {new_size}"
+                else:
+                    diff_record["detail"] = "touched"
+            yield diff_record, children
+
+    def diff_subtree(self, path, rel_dir, depth, marker, listings):
+        entries = self.visible_listing(listings, path, rel_dir) or []
+        entries.sort(key=lambda item: (not item[1][1], item[0].lower()))
+        for index, (name, record, rel_path) in enumerate(entries):
+            child = os.path.join(path, name)
+            is_dir = record[1]
+            self.diff_counts[marker] += 1
+            diff_record = {"path": child, "name": name, "depth": depth, "type": "dir" if is_dir else "file",
+                           "size": record[3], "mtime": record[4], "error": None,
+                           "last": index == len(entries) - 1, "change": marker, "detail": None}
+            children = None
+            if self.diff_descends(record):
+                children = self.diff_subtree(child, rel_path, depth + 1, marker, listings)
+            yield diff_record, children
+
+    def render_diff(self, records):
+        for record, line in self.render_records(records):
+            yield f"{record['change']} {line}"
+
+    def describe_record(self, record):
+        name = record["name"]
+        record_type = record["type"]
+        if record_type == "symlink":
+            return f"{name}/ -> {record['target']} [{record['error'] or 'symlink'}]"
+        if record_type == "error":
+            return f"{name}/ [{record['error']}]"
+            
+        text = f"{name}/" if record_type == "dir" else name
+        if self.show_metadata:
+            text = f"{text} {self.format_metadata(record)}"
+        if record.get("detail"):
+            text = f"{text} ({record['detail']})"
+        return text
+
+    def render_records(self, records):
+        prefixes = ['']
+        for record in records:
+            depth = record["depth"]
+            if depth == 0:
+                yield record, self.describe_record(record)
+                continue
+                
+            del prefixes[depth:]
+            indent = prefixes[depth - 1]
+            connector = '└── ' if record["last"] else '├── '
+            yield record, f"{indent}{connector}{self.describe_record(record)}"
+            if record["type"] == "dir":
+                prefixes.append(indent + ('    ' if record["last"] else '│   '))
+
+    def render_lines(self, records):
+        for _, line in self.render_records(records):
+            yield line
 
     def get_summary(self):
         if self.total_size < 1024:
@@ -181,7 +1244,7 @@ class DirectoryTreeGenerator:
         else:
             size_str = f"{self.total_size/(1024*1024*1024):.2f} GB"
             
-        top_file_types = sorted(self.file_types.items(), key=lambda x: x[1], reverse=True)[:5]
+        top_file_types = sorted(self.file_types.items(), key=lambda x: (-x[1], x[0]))[:5]
         file_types_str = ", ".join([f"{ext}: {count}" for ext, count in top_file_types])
         
         largest_size = self.largest_file[1]
@@ -206,42 +1269,137 @@ class DirectoryTreeGenerator:
             "newest_file": f"{newest_file_path} ({newest_file_date})"
         }
         
+        if self.snapshot is not None:
+            summary["snapshot_cache"] = self.get_cache_ratio()
+        if self.find_duplicates:
+            summary["duplicates"] = self.get_duplicate_summary()
+            
+        summary["heaviest_dirs"] = ", ".join(
+            f"{path}/ ({self.format_size(size)})" for path, size, _ in self.get_heaviest_directories()) or "N/A"
+        summary["largest_files"] = ", ".join(
+            f"{path} ({self.format_size(size)})" for path, size in self.get_largest_files()) or "N/A"
         return summary
 
-    def export_to_file(self, directory, output_file, exclude_list=None):
+    def spool_items(self, items, format_item, separator=''):
+        spool = tempfile.TemporaryFile('w+', encoding='utf-8')
         try:
-            tree_lines = self.generate_tree(directory)
-            summary = self.get_summary()
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(f"Directory tree for: {directory}\n")
-                f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Excluded items: {', '.join(exclude_list) if exclude_list else 'None'}\n\n")
-                
-                f.write("SUMMARY:\n")
-                f.write(f"Total files: {summary['total_files']}\n")
-                f.write(f"Total directories: {summary['total_dirs']}\n")
-                f.write(f"Total size: {summary['total_size']}\n")
-                f.write(f"Top file types: {summary['file_types']}\n")
-                f.write(f"Largest file: {summary['largest_file']}\n")
-                f.write(f"Newest file: {summary['newest_file']}\n\n")
-                
-                f.write("DIRECTORY TREE:\n")
-                f.write(".\n")
-                for line in tree_lines:
-                    f.write(f"{line}\n")
+            first = True
+            for item in items:
+                if not first:
+                    spool.write(separator)
+                spool.write(format_item(item))
+                first = False
+            spool.seek(0)
+        except BaseException:
+            spool.close()
+            raise
+        return spool
+
+    def export_to_file(self, directory, output_file, exclude_list=None, records=None):
+        try:
+            if records is None:
+                records = self.stream_records(directory)
+            lines = self.render_lines(records)
+            with self.spool_items(lines, lambda line: f"{line}\n") as tree_spool:
+                self.write_text_report(directory, output_file, tree_spool, exclude_list)
             logger.info(f"Directory tree successfully exported to {output_file}")
             return True
+        except WalkCancelled:
+            raise
         except Exception as e:
             logger.error(f"Error exporting to file: {e}")
             return False
+
+    def write_text_report(self, directory, output_file, tree_spool, exclude_list=None):
+        summary = self.get_summary()
+        
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(f"Directory tree for: {directory}\n")
+            f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"Excluded items: {', '.join(exclude_list) if exclude_list else 'None'}\n\n")
             
-    def export_to_html(self, directory, output_file):
-        try:
-            tree_lines = self.generate_tree(directory)
-            summary = self.get_summary()
+            f.write("SUMMARY:\n")
+            f.write(f"Total files: {summary['total_files']}\n")
+            f.write(f"Total directories: {summary['total_dirs']}\n")
+            f.write(f"Total size: {summary['total_size']}\n")
+            f.write(f"Top file types: {summary['file_types']}\n")
+            f.write(f"Largest file: {summary['largest_file']}\n")
+            f.write(f"Newest file: {summary['newest_file']}\n")
+            if "snapshot_cache" in summary:
+                f.write(f"Snapshot cache: {summary['snapshot_cache']}\n")
+            if "duplicates" in summary:
+                f.write(f"Duplicates: {summary['duplicates']}\n")
+            f.write("\n")
+            
+            f.write(f"HEAVIEST DIRECTORIES (top {self.top_n}):\n")
+            for path, size, files in self.get_heaviest_directories():
+                f.write(f"{self.format_size(size):>12}  {files:>8} files  {path}/\n")
+            f.write(f"\nLARGEST FILES (top {self.top_n}):\n")
+            for path, size in self.get_largest_files():
+                f.write(f"{self.format_size(size):>12}  {path}\n")
+            f.write("\n")
+            
+            f.write("DIRECTORY TREE:\n")
+            f.write(".\n")
+            shutil.copyfileobj(tree_spool, f)
+            
+            if self.duplicate_groups:
+                f.write("\nDUPLICATE FILES:\n")
+                for line in self.duplicate_lines():
+                    f.write(f"{line}\n")
+        
+    def format_html_row(self, record):
+        row = [record["depth"], RECORD_TYPES.index(record["type"]), 1 if record["last"] else 0, record["name"]]
+        if record["type"] in ("symlink", "error"):
+            row += [None, None, record["error"], record.get("target")]
+        elif self.show_metadata and record["size"] is not None:
+            row += [record["size"], int(record["mtime"])]
+        while row[-1] is None:
+            row.pop()
+        return json.dumps(row, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+            
+    def format_html_duplicates(self):
+        if not self.duplicate_groups:
+            return ""
             
-            html_content = f"""<!DOCTYPE html>
+        groups = []
+        for size, digest, files in self.duplicate_groups:
+            paths = "".join(f"<div class=\"file\">{html.escape(item[1])}</div>" for item in files)
+            groups.append(f"""
+            <details>
+                <summary>{self.format_size(size)} x {len(files)} <span class="metadata">{digest[:16]}</span></summary>
+                {paths}
+            </details>""")
+        return f"""
+        
+        <div class="tree-container">
+            <h2>Duplicate Files</h2>{"".join(groups)}
+        </div>"""
+            
+    def export_to_html(self, directory, output_file, records=None):
+        try:
+            if records is None:
+                records = self.stream_records(directory)
+            with self.spool_items(records, self.format_html_row, ",\n") as tree_spool:
+                self.write_html_report(directory, output_file, tree_spool)
+                
+            logger.info(f"HTML report successfully generated at {output_file}")
+            return True
+        except WalkCancelled:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating HTML report: {e}")
+            return False
+
+    def write_html_report(self, directory, output_file, tree_spool):
+        summary = self.get_summary()
+        cache_html = ""
+        if "snapshot_cache" in summary:
+            cache_html = f"\n                    <p><strong>Snapshot cache:</strong> {summary['snapshot_cache']}</p>"
+        if "duplicates" in summary:
+            cache_html += f"\n                    <p><strong>Duplicates:</strong> {summary['duplicates']}</p>"
+        
+        html_header = f"""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
@@ -259,6 +1417,13 @@ class DirectoryTreeGenerator:
         .file {{ color: #333; }}
         .metadata {{ color: #7f8c8d; font-size: 0.9em; }}
         .error {{ color: #e74c3c; }}
+        .tree-toolbar {{ display: flex; gap: 10px; align-items: center; margin-bottom: 10px; }}
+        .tree-toolbar input {{ flex: 1; padding: 6px; }}
+        .tree-viewport {{ height: 70vh; overflow: auto; position: relative; font-family: 'Courier New', monospace; font-size: 14px; }}
+        .tree-canvas {{ position: relative; }}
+        .tree-row {{ position: absolute; left: 0; right: 0; height: 20px; line-height: 20px; white-space: pre; }}
+        .tree-row.collapsed, .tree-row.expanded {{ cursor: pointer; }}
+        .tree-row.collapsed::after {{ content: ' \\25B8'; color: #7f8c8d; }}
     </style>
 </head>
 <body>
@@ -286,46 +1451,807 @@ class DirectoryTreeGenerator:
                 <div class="summary-item">
                     <h3>Notable Files</h3>
                     <p><strong>Largest:</strong> {summary['largest_file']}</p>
-                    <p><strong>Newest:</strong> {summary['newest_file']}</p>
+                    <p><strong>Newest:</strong> {summary['newest_file']}</p>{cache_html}
+                </div>
+                <div class="summary-item">
+                    <h3>Heaviest Directories</h3>
+                    <ol>{"".join(f"<li>{html.escape(path)}/ <span class='metadata'>{self.format_size(size)}, {files} files</span></li>" for path, size, files in self.get_heaviest_directories())}</ol>
+                </div>
+                <div class="summary-item">
+                    <h3>Largest Files</h3>
+                    <ol>{"".join(f"<li>{html.escape(path)} <span class='metadata'>{self.format_size(size)}</span></li>" for path, size in self.get_largest_files())}</ol>
                 </div>
             </div>
         </div>
         
         <div class="tree-container">
             <h2>Directory Tree</h2>
-                <div>.</div>
-"""
-            
-            for line in tree_lines:
-                line_html = line.replace(" ", "&nbsp;").replace("<", "&lt;").replace(">", "&gt;")
-                if line.strip().endswith('/') or ']' in line and '/' in line.split(']')[0]:
-                    html_content += f'                <div class="folder">{line_html}</div>\n'
-                elif '[error:' in line or '[permission denied]' in line:
-                    html_content += f'                <div class="error">{line_html}</div>\n'
-                else:
-                    html_content += f'                <div class="file">{line_html}</div>\n'
-            
-            html_content += """            
-        </div>
+            <div class="tree-toolbar">
+                <input id="tree-search" type="search" placeholder="Search names...">
+                <button id="expand-all">Expand all</button>
+                <button id="collapse-all">Collapse all</button>
+                <span id="tree-status"></span>
+            </div>
+            <div class="folder">.</div>
+            <div id="tree-viewport" class="tree-viewport"><div id="tree-canvas" class="tree-canvas"></div></div>
+        </div>{self.format_html_duplicates()}
     </div>
+    <script id="tree-data" type="application/json">[
+"""
+        
+        html_footer = f"""
+]</script>
+    <script>
+    (function () {{
+        var ROW_HEIGHT = 20;
+        var OVERSCAN = 20;
+        var SHOW_METADATA = {"true" if self.show_metadata else "false"};
+        var rows = JSON.parse(document.getElementById('tree-data').textContent);
+        var count = rows.length;
+        var parent = new Int32Array(count);
+        var end = new Int32Array(count);
+        var expanded = new Uint8Array(count);
+        var stack = [];
+        for (var i = 0; i < count; i++) {{
+            while (stack.length && rows[stack[stack.length - 1]][0] >= rows[i][0]) {{
+                end[stack.pop()] = i;
+            }}
+            parent[i] = stack.length ? stack[stack.length - 1] : -1;
+            end[i] = i + 1;
+            if (rows[i][0] > 0 && rows[i][1] === 0) stack.push(i);
+        }}
+        while (stack.length) {{
+            end[stack.pop()] = count;
+        }}
+
+        var viewport = document.getElementById('tree-viewport');
+        var canvas = document.getElementById('tree-canvas');
+        var status = document.getElementById('tree-status');
+        var search = document.getElementById('tree-search');
+        var visible = [];
+        var matches = null;
+        var haystack = null;
+        var rowStarts = null;
+
+        function escapeHtml(text) {{
+            return String(text).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+        }}
+
+        function fixed1(value) {{
+            var scaled = value * 10;
+            var whole = Math.floor(scaled);
+            var rest = scaled - whole;
+            if (rest > 0.5 || (rest === 0.5 && whole % 2 === 1)) whole += 1;
+            return (whole / 10).toFixed(1);
+        }}
+
+        function formatSize(size) {{
+            if (size < 1024) return size + ' bytes';
+            if (size < 1024 * 1024) return fixed1(size / 1024) + ' KB';
+            return fixed1(size / (1024 * 1024)) + ' MB';
+        }}
+
+        function pad(value) {{
+            return value < 10 ? '0' + value : '' + value;
+        }}
+
+        function formatMetadata(row) {{
+            if (row[4] === undefined || row[4] === null) return ' [error reading metadata]';
+            var date = new Date(row[5] * 1000);
+            return ' [' + formatSize(row[4]) + ', modified: ' + date.getFullYear() + '-' + pad(date.getMonth() + 1) +
+                '-' + pad(date.getDate()) + ' ' + pad(date.getHours()) + ':' + pad(date.getMinutes()) + ']';
+        }}
+
+        function hasChildren(index) {{
+            return end[index] > index + 1;
+        }}
+
+        function prefix(index) {{
+            var depth = rows[index][0];
+            if (depth === 0) return '';
+            var parts = [];
+            for (var node = parent[index]; node !== -1 && rows[node][0] > 0; node = parent[node]) {{
+                parts.push(rows[node][2] ? '    ' : '│   ');
+            }}
+            return parts.reverse().join('') + (rows[index][2] ? '└── ' : '├── ');
+        }}
+
+        function label(index) {{
+            var row = rows[index];
+            var type = row[1];
+            if (type === 2) return row[3] + '/ -> ' + row[7] + ' [' + (row[6] || 'symlink') + ']';
+            if (type === 3) return row[3] + '/ [' + row[6] + ']';
+            var text = type === 0 ? row[3] + '/' : row[3];
+            return SHOW_METADATA ? text + formatMetadata(row) : text;
+        }}
+
+        function fullPath(index) {{
+            var parts = [];
+            for (var node = index; node !== -1; node = parent[node]) {{
+                if (rows[node][1] < 2 || node === index) parts.push(rows[node][3]);
+            }}
+            return parts.reverse().join('/');
+        }}
+
+        function rowClass(index) {{
+            var type = rows[index][1];
+            if (type === 3) return 'error';
+            if (type === 1) return 'file';
+            return 'folder' + (hasChildren(index) ? (expanded[index] ? ' expanded' : ' collapsed') : '');
+        }}
+
+        function rebuild() {{
+            visible = [];
+            var index = 0;
+            while (index < count) {{
+                visible.push(index);
+                index = hasChildren(index) && !expanded[index] ? end[index] : index + 1;
+            }}
+            update();
+        }}
+
+        function update() {{
+            var list = matches || visible;
+            canvas.style.height = (list.length * ROW_HEIGHT) + 'px';
+            status.textContent = matches ? matches.length + ' matches' : visible.length + ' of ' + count + ' entries shown';
+            render();
+        }}
+
+        function render() {{
+            var list = matches || visible;
+            var first = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+            var last = Math.min(list.length, Math.ceil((viewport.scrollTop + viewport.clientHeight) / ROW_HEIGHT) + OVERSCAN);
+            var html = [];
+            for (var position = first; position < last; position++) {{
+                var index = list[position];
+                var text = matches ? fullPath(index) : prefix(index) + label(index);
+                html.push('<div class="tree-row ' + rowClass(index) + '" data-index="' + index + '" style="top:' +
+                    (position * ROW_HEIGHT) + 'px">' + escapeHtml(text) + '</div>');
+            }}
+            canvas.innerHTML = html.join('');
+        }}
+
+        function reveal(index) {{
+            for (var node = parent[index]; node !== -1; node = parent[node]) {{
+                expanded[node] = 1;
+            }}
+            matches = null;
+            search.value = '';
+            rebuild();
+            viewport.scrollTop = Math.max(0, visible.indexOf(index) * ROW_HEIGHT - viewport.clientHeight / 2);
+            render();
+        }}
+
+        function buildIndex() {{
+            var names = new Array(count);
+            rowStarts = new Int32Array(count);
+            var offset = 0;
+            for (var i = 0; i < count; i++) {{
+                names[i] = String(rows[i][3]).toLowerCase();
+                rowStarts[i] = offset;
+                offset += names[i].length + 1;
+            }}
+            haystack = names.join('\\n');
+        }}
+
+        function rowAt(offset) {{
+            var low = 0, high = count - 1;
+            while (low < high) {{
+                var middle = (low + high + 1) >> 1;
+                if (rowStarts[middle] <= offset) low = middle; else high = middle - 1;
+            }}
+            return low;
+        }}
+
+        function runSearch() {{
+            var query = search.value.trim().toLowerCase();
+            if (!query) {{
+                matches = null;
+                update();
+                return;
+            }}
+            if (haystack === null) buildIndex();
+            matches = [];
+            var position = haystack.indexOf(query);
+            while (position !== -1) {{
+                var index = rowAt(position);
+                matches.push(index);
+                position = index + 1 < count ? haystack.indexOf(query, rowStarts[index + 1]) : -1;
+            }}
+            viewport.scrollTop = 0;
+            update();
+        }}
+
+        var scheduled = false;
+        viewport.addEventListener('scroll', function () {{
+            if (scheduled) return;
+            scheduled = true;
+            window.requestAnimationFrame(function () {{
+                scheduled = false;
+                render();
+            }});
+        }});
+
+        canvas.addEventListener('click', function (event) {{
+            var target = event.target.closest('.tree-row');
+            if (!target) return;
+            var index = parseInt(target.getAttribute('data-index'), 10);
+            if (matches) {{
+                reveal(index);
+            }} else if (hasChildren(index)) {{
+                expanded[index] = expanded[index] ? 0 : 1;
+                rebuild();
+            }}
+        }});
+
+        var searchTimer = null;
+        search.addEventListener('input', function () {{
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(runSearch, 200);
+        }});
+
+        document.getElementById('expand-all').addEventListener('click', function () {{
+            expanded.fill(1);
+            rebuild();
+        }});
+
+        document.getElementById('collapse-all').addEventListener('click', function () {{
+            expanded.fill(0);
+            rebuild();
+        }});
+
+        window.addEventListener('resize', render);
+        rebuild();
+    }})();
+    </script>
 </body>
 </html>"""
-            
+        
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(html_header)
+            shutil.copyfileobj(tree_spool, f)
+            f.write(html_footer)
+
+    def export_to_ndjson(self, directory, output_file, records=None):
+        try:
+            if records is None:
+                records = self.stream_records(directory)
             with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+                for record in records:
+                    f.write(json.dumps(record) + "\n")
+                for index, (size, digest, files) in enumerate(self.duplicate_groups):
+                    f.write(json.dumps({"type": "duplicate", "group": index, "size": size, "hash": digest,
+                                        "paths": [item[1] for item in files]}) + "\n")
+                f.write(json.dumps({"type": "summary", **self.get_summary()}) + "\n")
+            logger.info(f"NDJSON export successfully written to {output_file}")
+            return True
+        except WalkCancelled:
+            raise
+        except Exception as e:
+            logger.error(f"Error exporting NDJSON: {e}")
+            return False
+
+    def export_to_columnar(self, directory, output_file, chunk_size=65536, records=None):
+        if records is None:
+            records = self.stream_records(directory)
+        spools = {name: tempfile.TemporaryFile('w+b') for name, _, _ in COLUMNAR_LAYOUT}
+        try:
+            buffers = {name: array(code) for name, _, code in COLUMNAR_LAYOUT if code}
+            data_sizes = {"path": 0, "error": 0, "target": 0}
+            for column in data_sizes:
+                buffers[f"{column}_offsets"].append(0)
                 
-            logger.info(f"HTML report successfully generated at {output_file}")
+            count = 0
+            for record in records:
+                buffers["depth"].append(record["depth"])
+                buffers["type"].append(RECORD_TYPES.index(record["type"]))
+                buffers["last"].append(1 if record["last"] else 0)
+                buffers["size"].append(-1 if record["size"] is None else record["size"])
+                buffers["mtime"].append(math.nan if record["mtime"] is None else record["mtime"])
+                buffers["duplicate_group"].append(-1)
+                for column in data_sizes:
+                    value = record.get(column)
+                    if value:
+                        encoded = value.encode('utf-8', 'surrogateescape')
+                        spools[f"{column}_data"].write(encoded)
+                        data_sizes[column] += len(encoded)
+                    buffers[f"{column}_offsets"].append(data_sizes[column])
+                count += 1
+                if count % chunk_size == 0:
+                    self.flush_columns(buffers, spools)
+            self.flush_columns(buffers, spools)
+            
+            groups = spools["duplicate_group"]
+            for index, (_, _, files) in enumerate(self.duplicate_groups):
+                for item in files:
+                    groups.seek(item[2] * 4)
+                    groups.write(struct.pack('<i', index))
+            groups.seek(0, os.SEEK_END)
+            
+            self.write_columnar_file(output_file, spools, count)
+            logger.info(f"Columnar export successfully written to {output_file}")
             return True
+        except WalkCancelled:
+            raise
         except Exception as e:
-            logger.error(f"Error generating HTML report: {e}")
+            logger.error(f"Error exporting columnar file: {e}")
             return False
+        finally:
+            for spool in spools.values():
+                spool.close()
+
+    def flush_columns(self, buffers, spools):
+        for name, buffer in buffers.items():
+            if sys.byteorder == 'big':
+                buffer.byteswap()
+            buffer.tofile(spools[name])
+            del buffer[:]
+
+    def write_columnar_file(self, output_file, spools, count):
+        offset = COLUMNAR_HEADER.size + COLUMNAR_COLUMN.size * len(COLUMNAR_LAYOUT)
+        table = []
+        for name, dtype, _ in COLUMNAR_LAYOUT:
+            offset += -offset % 8
+            length = spools[name].tell()
+            table.append(COLUMNAR_COLUMN.pack(name.encode(), dtype.encode(), offset, length))
+            offset += length
+            
+        with open(output_file, 'wb') as f:
+            f.write(COLUMNAR_HEADER.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION, len(COLUMNAR_LAYOUT), count))
+            f.write(b''.join(table))
+            for name, _, _ in COLUMNAR_LAYOUT:
+                f.write(b'\0' * (-f.tell() % 8))
+                spools[name].seek(0)
+                shutil.copyfileobj(spools[name], f)
+
+
+class InotifySource:
+    name = "inotify"
+    
+    def __init__(self, watcher):
+        import ctypes
+        import select
+        
+        self.watcher = watcher
+        self.select = select.select
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.get_errno = ctypes.get_errno
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            self.raise_error()
+        self.paths = {}
+        self.watches = {}
+
+    def raise_error(self):
+        errno = self.get_errno()
+        raise OSError(errno, os.strerror(errno))
+
+    def watch(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), INOTIFY_MASK)
+        if wd < 0:
+            self.raise_error()
+        self.paths[path] = wd
+        self.watches[wd] = path
+
+    def unwatch(self, path):
+        wd = self.paths.pop(path, None)
+        if wd is not None and self.watches.get(wd) == path:
+            del self.watches[wd]
+            self.libc.inotify_rm_watch(self.fd, wd)
+
+    def wait(self, timeout):
+        dirty = set()
+        ready, _, _ = self.select([self.fd], [], [], timeout)
+        if not ready:
+            return dirty
+            
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                name = data[offset + INOTIFY_EVENT.size:offset + INOTIFY_EVENT.size + length].rstrip(b'\0')
+                offset += INOTIFY_EVENT.size + length
+                if mask & INOTIFY_OVERFLOW:
+                    logger.warning("inotify queue overflowed, rescanning all watched directories")
+                    dirty.update(self.paths)
+                    continue
+                    
+                path = self.watches.get(wd)
+                if path is None:
+                    continue
+                if mask & INOTIFY_IGNORED:
+                    del self.watches[wd]
+                    if self.paths.get(path) == wd:
+                        del self.paths[path]
+                elif not name or not self.watcher.is_ignored(os.path.join(path, os.fsdecode(name))):
+                    dirty.add(path)
+        return dirty
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingSource:
+    name = "polling"
+    
+    def __init__(self, watcher, interval):
+        self.watcher = watcher
+        self.interval = interval
+        self.mtimes = {}
+        self.next_poll = time.monotonic() + interval
+
+    def stat_mtime(self, path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def watch(self, path):
+        self.mtimes[path] = self.stat_mtime(path)
+
+    def unwatch(self, path):
+        self.mtimes.pop(path, None)
+
+    def wait(self, timeout):
+        delay = self.next_poll - time.monotonic()
+        if delay > 0:
+            self.watcher.stop_event.wait(min(timeout, delay))
+            return set()
+            
+        self.next_poll = time.monotonic() + self.interval
+        dirty = set()
+        for path, mtime in list(self.mtimes.items()):
+            current = self.stat_mtime(path)
+            if current != mtime:
+                self.mtimes[path] = current
+                dirty.add(path)
+                
+        for path, children in self.watcher.tree.items():
+            if path in dirty:
+                continue
+            for record in children:
+                if record["type"] != "file" or self.watcher.is_ignored(record["path"]):
+                    continue
+                try:
+                    stats = os.stat(record["path"])
+                except OSError:
+                    dirty.add(path)
+                    break
+                if stats.st_size != record["size"] or stats.st_mtime != record["mtime"]:
+                    dirty.add(path)
+                    break
+        return dirty
+
+    def close(self):
+        self.mtimes = {}
+
+
+class TreeWatcher:
+    def __init__(self, generator, directory, on_change=None, debounce=0.2, poll_interval=2.0, use_polling=False):
+        self.generator = generator
+        self.directory = directory
+        self.root = os.fspath(directory)
+        self.on_change = on_change
+        self.debounce = debounce
+        self.max_latency = max(1.0, debounce * 5)
+        self.poll_interval = poll_interval
+        self.use_polling = use_polling
+        self.stop_event = threading.Event()
+        self.source = None
+        self.ignored = set()
+        self.tree = {}
+        self.info = {}
+        self.counted = {}
+        self.ignore_stamps = {}
+        self.changes = []
+        self.fresh = set()
+        self.stale = False
+        self.last_update = 0
+
+    def ignore(self, path):
+        self.ignored.add(os.path.abspath(path))
+
+    def is_ignored(self, path):
+        return bool(self.ignored) and os.path.abspath(path) in self.ignored
+
+    def open_source(self):
+        if not self.use_polling:
+            try:
+                return InotifySource(self)
+            except (OSError, AttributeError, TypeError) as e:
+                logger.warning(f"inotify unavailable ({e}), falling back to polling")
+        return PollingSource(self, self.poll_interval)
+
+    def watch(self, path):
+        try:
+            self.source.watch(path)
+        except OSError as e:
+            logger.warning(f"Could not watch {path} ({e}), falling back to polling")
+            self.source.close()
+            self.source = PollingSource(self, self.poll_interval)
+            for watched in self.info:
+                self.source.watch(watched)
+
+    def build(self):
+        generator = self.generator
+        generator.reset_stats()
+        generator.snapshot = None
+        generator.directory_rules = {}
+        self.tree = {}
+        self.info = {}
+        self.counted = {}
+        self.ignore_stamps = {}
+        self.source = self.open_source()
+        
+        started = time.perf_counter()
+        notes = []
+        directory, resolved_path = generator.open_root(self.directory, notes)
+        if resolved_path is None:
+            self.tree[self.root] = notes
+        else:
+            self.scan_tree(self.root, directory.name, resolved_path, 0, True)
+        self.last_update = time.perf_counter() - started
+        logger.info(f"Watching {len(self.info)} directories with {self.source.name} "
+                    f"(initial scan {self.last_update:.2f}s)")
+
+    def scan_tree(self, path, name, resolved_path, depth, is_last):
+        pending = [(path, name, resolved_path, depth, is_last)]
+        while pending:
+            if self.generator.cancel_event.is_set():
+                logger.info("Directory walk cancelled")
+                raise WalkCancelled("walk cancelled")
+            pending.extend(self.scan_level(*pending.pop()))
+
+    def ignore_stamp(self, path):
+        if not self.generator.use_gitignore:
+            return None
+        try:
+            stats = os.stat(os.path.join(path, '.gitignore'))
+            return stats.st_mtime_ns, stats.st_size
+        except OSError:
+            return None
+
+    def scan_level(self, path, name, resolved_path, depth, is_last, keep=None):
+        generator = self.generator
+        self.info[path] = (name, resolved_path, depth, is_last)
+        self.fresh.add(path)
+        self.watch(path)
+        self.ignore_stamps[path] = self.ignore_stamp(path)
+        
+        notes = []
+        entries = generator.open_directory(path, name, depth + 1, is_last, notes)
+        if entries is None:
+            self.tree[path] = notes
+            return []
+            
+        children = []
+        pending = []
+        for index, (entry, is_dir) in enumerate(entries):
+            entry_last = (index == len(entries) - 1)
+            children.append(self.add_record(path, entry, is_dir, depth + 1, entry_last))
+            if not is_dir:
+                continue
+                
+            if keep is not None and entry.path in keep:
+                keep.discard(entry.path)
+                if not entry.is_symlink():
+                    generator.pending_rules.pop(entry.path, None)
+                    self.relink(entry.path, entry_last)
+                    continue
+                self.drop_subtree(entry.path)
+                
+            if generator.max_depth is not None and depth + 1 >= generator.max_depth:
+                generator.pending_rules.pop(entry.path, None)
+                continue
+                
+            child_resolved, status = generator.enter_directory(entry, resolved_path)
+            if status:
+                generator.pending_rules.pop(entry.path, None)
+                self.tree[entry.path] = [generator.symlink_note(entry, depth + 2, entry_last, status, child_resolved)]
+                continue
+                
+            generator.visited_paths.add(child_resolved)
+            pending.append((entry.path, entry.name, child_resolved, depth + 1, entry_last))
+            
+        self.tree[path] = children
+        return pending
+
+    def add_record(self, parent, entry, is_dir, depth, is_last):
+        generator = self.generator
+        counted = generator.total_files + generator.total_dirs
+        record = generator.make_record(entry, is_dir, depth, is_last)
+        if generator.total_files + generator.total_dirs != counted:
+            self.counted[record["path"]] = parent
+        return record
+
+    def forget(self, record):
+        if record["type"] not in ("dir", "file") or self.counted.pop(record["path"], None) is None:
+            return
+        generator = self.generator
+        generator.forget_record(record)
+        if record["path"] in (generator.largest_file[0], generator.newest_file[0]):
+            self.stale = True
+
+    def relink(self, path, is_last):
+        name, resolved_path, depth, _ = self.info[path]
+        self.info[path] = (name, resolved_path, depth, is_last)
+        for record in self.tree.get(path, ()):
+            if record["path"] == path:
+                record["last"] = is_last
+
+    def drop_subtree(self, path):
+        stack = [path]
+        while stack:
+            path = stack.pop()
+            children = self.tree.pop(path, ())
+            info = self.info.pop(path, None)
+            if info is not None:
+                self.generator.visited_paths.discard(info[1])
+                self.source.unwatch(path)
+            self.generator.directory_rules.pop(path, None)
+            self.ignore_stamps.pop(path, None)
+            for record in children:
+                self.forget(record)
+                if record["type"] == "dir":
+                    stack.append(record["path"])
+
+    def rescan(self, path):
+        generator = self.generator
+        name, resolved_path, depth, is_last = self.info[path]
+        old_children = self.tree.get(path, [])
+        old_records = {record["path"]: record for record in old_children if record["type"] in ("dir", "file")}
+        
+        keep = set()
+        if self.ignore_stamp(path) == self.ignore_stamps.get(path):
+            keep = {child for child, record in old_records.items() if record["type"] == "dir" and child in self.info}
+        for record in old_children:
+            self.forget(record)
+        for child, record in old_records.items():
+            if record["type"] == "dir" and child not in keep:
+                self.drop_subtree(child)
+                
+        rules = generator.directory_rules.get(path)
+        if rules is not None:
+            generator.pending_rules[path] = rules
+        pending = self.scan_level(path, name, resolved_path, depth, is_last, keep)
+        for child in keep:
+            self.drop_subtree(child)
+        for task in pending:
+            self.scan_tree(*task)
+            
+        new_records = {record["path"]: record for record in self.tree.get(path, ()) if record["type"] in ("dir", "file")}
+        for child, record in new_records.items():
+            old = old_records.get(child)
+            if old is None:
+                self.changes.append(("+", record))
+            elif (old["type"], old["size"], old["mtime"]) != (record["type"], record["size"], record["mtime"]):
+                self.changes.append(("~", record))
+        for child, record in old_records.items():
+            if child not in new_records:
+                self.changes.append(("-", record))
+
+    def find_file(self, path):
+        for record in self.tree.get(self.counted.get(path), ()):
+            if record["path"] == path and record["type"] == "file":
+                return record
+        return None
+
+    def refresh_extremes(self):
+        generator = self.generator
+        self.stale = False
+        largest = self.find_file(generator.largest_file[0])
+        newest = self.find_file(generator.newest_file[0])
+        if (largest is not None and largest["size"] == generator.largest_file[1] and newest is not None
+                and datetime.fromtimestamp(newest["mtime"]) == generator.newest_file[1]):
+            return
+            
+        largest = ("", 0)
+        newest = ("", None)
+        for children in self.tree.values():
+            for record in children:
+                if record["type"] != "file" or record["size"] is None or record["path"] not in self.counted:
+                    continue
+                if record["size"] > largest[1]:
+                    largest = (record["path"], record["size"])
+                if newest[1] is None or record["mtime"] > newest[1]:
+                    newest = (record["path"], record["mtime"])
+        generator.largest_file = largest
+        generator.newest_file = (newest[0], datetime.fromtimestamp(newest[1])) if newest[0] else ("", datetime.min)
+
+    def apply(self, dirty):
+        started = time.perf_counter()
+        self.changes = []
+        self.fresh = set()
+        if self.generator.show_metadata:
+            dirty = dirty | {os.path.dirname(path) for path in dirty if os.path.dirname(path) in self.info}
+            
+        for path in sorted(dirty, key=lambda item: item.count(os.sep)):
+            if path in self.info and path not in self.fresh:
+                self.rescan(path)
+        if self.stale:
+            self.refresh_extremes()
+            
+        self.last_update = time.perf_counter() - started
+        return self.changes
+
+    def records(self):
+        self.generator.reset_rollups()
+        self.generator.records_emitted = 0
+        return self.generator.track_records(self.root, self.iter_tree())
+
+    def iter_tree(self):
+        stack = [iter(self.tree.get(self.root, ()))]
+        while stack:
+            record = next(stack[-1], None)
+            if record is None:
+                stack.pop()
+                continue
+            yield record
+            if record["type"] == "dir" and record["path"] in self.tree:
+                stack.append(iter(self.tree[record["path"]]))
+
+    def run(self):
+        pending = set()
+        first_event = last_event = 0
+        try:
+            while not self.stop_event.is_set():
+                timeout = 0.5
+                if pending:
+                    deadline = min(last_event + self.debounce, first_event + self.max_latency)
+                    timeout = max(0, deadline - time.monotonic())
+                    
+                dirty = self.source.wait(timeout)
+                now = time.monotonic()
+                if dirty:
+                    if not pending:
+                        first_event = now
+                    pending |= dirty
+                    last_event = now
+                    
+                if pending and (now - last_event >= self.debounce or now - first_event >= self.max_latency):
+                    changes = self.apply(pending)
+                    pending = set()
+                    if changes:
+                        logger.info(f"Applied {len(changes)} changes in {self.last_update * 1000:.1f} ms")
+                        if self.on_change is not None:
+                            self.on_change(changes)
+        finally:
+            self.close()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def close(self):
+        if self.source is not None:
+            self.source.close()
 
 
 class DirectoryTreeApp:    
+    OUTPUT_FILES = {
+        "text": "directory_tree.txt",
+        "html": "directory_tree.html",
+        "ndjson": "directory_tree.ndjson",
+        "columnar": "directory_tree.dtc"
+    }
+    
     def __init__(self):
         self.tree_generator = DirectoryTreeGenerator()
         self.root = None
         self.output_text = None
+        self.output_lines = []
+        self.view_start = 0
+        self.line_height = 16
+        self.ui_queue = queue.Queue()
+        self.worker = None
+        self.watcher = None
+        self.watch_status = None
+        self.started_at = 0
         
     def validate_inputs(self, directory, exclude_input=None):
         if not directory or not Path(directory).exists():
@@ -336,13 +2262,17 @@ class DirectoryTreeApp:
             for item in exclude_input.split(','):
                 if not item.strip():
                     continue
-                if any(c in item for c in ['\\', '/', '*', '?', '[', ']', ':', '|', '<', '>']):
+                if any(c in item for c in [':', '|', '<', '>']):
                     logger.warning(f"Potentially invalid exclusion pattern: {item}")
                     return False, f"The exclusion pattern '{item}' contains invalid characters."
         
         return True, ""
     
     def run_gui(self):
+        import customtkinter as ctk
+        from tkinter import StringVar, BooleanVar
+        from tkinter.filedialog import askdirectory
+        
         ctk.set_appearance_mode("System")
         ctk.set_default_color_theme("blue")
         
@@ -400,6 +2330,14 @@ class DirectoryTreeApp:
                              placeholder_text=".py, .txt, .md")
         filter_entry.pack(side="left", expand=True, fill="x", padx=5)
         
+        include_label = ctk.CTkLabel(filter_frame, text="Include:", anchor="w")
+        include_label.pack(side="left", padx=(10, 5))
+        
+        include_var = StringVar()
+        include_entry = ctk.CTkEntry(filter_frame, textvariable=include_var, width=200, 
+                              placeholder_text="src/**/*.py, *.md")
+        include_entry.pack(side="left", expand=True, fill="x", padx=5)
+        
         checkbox_frame = ctk.CTkFrame(options_frame)
         checkbox_frame.pack(fill="x", padx=10, pady=5)
         
@@ -413,6 +2351,21 @@ class DirectoryTreeApp:
                                      variable=symlinks_var)
         symlinks_check.pack(side="left", padx=10)
         
+        gitignore_var = BooleanVar(value=False)
+        gitignore_check = ctk.CTkCheckBox(checkbox_frame, text="Honor .gitignore", 
+                                      variable=gitignore_var)
+        gitignore_check.pack(side="left", padx=10)
+        
+        duplicates_var = BooleanVar(value=False)
+        duplicates_check = ctk.CTkCheckBox(checkbox_frame, text="Find duplicate files", 
+                                       variable=duplicates_var)
+        duplicates_check.pack(side="left", padx=10)
+        
+        watch_var = BooleanVar(value=False)
+        watch_check = ctk.CTkCheckBox(checkbox_frame, text="Watch for changes", 
+                                  variable=watch_var)
+        watch_check.pack(side="left", padx=10)
+        
         output_frame = ctk.CTkFrame(main_frame)
         output_frame.pack(fill="x", padx=10, pady=10)
         
@@ -437,6 +2390,14 @@ class DirectoryTreeApp:
                                        variable=output_type_var, value="html")
         output_radio3.pack(side="left", padx=10)
         
+        output_radio4 = ctk.CTkRadioButton(radio_frame, text="Export NDJSON", 
+                                       variable=output_type_var, value="ndjson")
+        output_radio4.pack(side="left", padx=10)
+        
+        output_radio5 = ctk.CTkRadioButton(radio_frame, text="Export columnar", 
+                                       variable=output_type_var, value="columnar")
+        output_radio5.pack(side="left", padx=10)
+        
         button_frame = ctk.CTkFrame(main_frame)
         button_frame.pack(fill="x", padx=10, pady=10)
         
@@ -444,12 +2405,18 @@ class DirectoryTreeApp:
         self.progress_bar.pack(side="left", padx=(10, 5), expand=True, fill="x")
         self.progress_bar.set(0)
         
-        generate_button = ctk.CTkButton(button_frame, text="Generate Tree", 
+        self.cancel_button = ctk.CTkButton(button_frame, text="Cancel", state="disabled",
+                                           command=self.cancel_generation)
+        self.cancel_button.pack(side="right", padx=5)
+        
+        self.generate_button = ctk.CTkButton(button_frame, text="Generate Tree", 
                                     command=lambda: self.start_generation(
                                         directory_var.get(), exclude_var.get(), 
                                         metadata_var.get(), symlinks_var.get(),
-                                        filter_var.get(), output_type_var.get()))
-        generate_button.pack(side="right", padx=5)
+                                        filter_var.get(), output_type_var.get(),
+                                        include_var.get(), gitignore_var.get(),
+                                        duplicates_var.get(), watch_var.get()))
+        self.generate_button.pack(side="right", padx=5)
         
         output_tabs = ctk.CTkTabview(main_frame)
         output_tabs.pack(fill="both", expand=True, padx=10, pady=(5, 10))
@@ -457,9 +2424,19 @@ class DirectoryTreeApp:
         output_tab = output_tabs.add("Output")
         summary_tab = output_tabs.add("Summary")
         
-        self.output_text = ctk.CTkTextbox(output_tab, wrap="none", font=("Courier New", 12))
+        self.output_scrollbar = ctk.CTkScrollbar(output_tab, command=self.scroll_output)
+        self.output_scrollbar.pack(side="right", fill="y", pady=5)
+        
+        self.output_text = ctk.CTkTextbox(output_tab, wrap="none", font=("Courier New", 12), activate_scrollbars=False)
+        output_xscrollbar = ctk.CTkScrollbar(output_tab, orientation="horizontal", command=self.output_text.xview)
+        output_xscrollbar.pack(side="bottom", fill="x", padx=5)
+        self.output_text.configure(xscrollcommand=output_xscrollbar.set)
         self.output_text.pack(fill="both", expand=True, padx=5, pady=5)
         
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.output_text.bind(sequence, self.on_output_wheel)
+        self.output_text.bind("<Configure>", lambda event: self.render_output())
+        
         summary_frame = ctk.CTkFrame(summary_tab)
         summary_frame.pack(fill="both", expand=True, padx=5, pady=5)
         
@@ -469,7 +2446,12 @@ class DirectoryTreeApp:
             "total_size": ctk.CTkLabel(summary_frame, text="Total Size: -", anchor="w"),
             "file_types": ctk.CTkLabel(summary_frame, text="Top File Types: -", anchor="w"),
             "largest_file": ctk.CTkLabel(summary_frame, text="Largest File: -", anchor="w"),
-            "newest_file": ctk.CTkLabel(summary_frame, text="Newest File: -", anchor="w")
+            "newest_file": ctk.CTkLabel(summary_frame, text="Newest File: -", anchor="w"),
+            "duplicates": ctk.CTkLabel(summary_frame, text="Duplicates: -", anchor="w"),
+            "heaviest_dirs": ctk.CTkLabel(summary_frame, text="Heaviest Directories: -", anchor="w",
+                                          justify="left", wraplength=800),
+            "largest_files": ctk.CTkLabel(summary_frame, text="Largest Files: -", anchor="w",
+                                          justify="left", wraplength=800)
         }
         
         summary_title = ctk.CTkLabel(summary_frame, text="Directory Summary", 
@@ -485,29 +2467,56 @@ class DirectoryTreeApp:
         
         self.root.mainloop()
     
-    def start_generation(self, directory, exclude_input, show_metadata, follow_symlinks, filter_input, output_type):
+    def start_generation(self, directory, exclude_input, show_metadata, follow_symlinks, filter_input, output_type,
+                         include_input="", use_gitignore=False, find_duplicates=False, watch=False):
+        from tkinter.messagebox import showerror
+        
+        if self.worker is not None and self.worker.is_alive():
+            return
+            
         valid, error_msg = self.validate_inputs(directory, exclude_input)
+        if valid:
+            valid, error_msg = self.validate_inputs(directory, include_input)
         if not valid:
             showerror("Input Error", error_msg)
             return
             
-        self.output_text.delete("1.0", "end")
+        self.update_output("")
         self.status_var.set("Processing...")
         self.progress_bar.start()
+        self.generate_button.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
         
         for label in self.summary_stats.values():
             label.configure(text=label.cget("text").split(":")[0] + ": -")
         
-        thread = threading.Thread(target=self.generate_tree, args=(
+        self.started_at = time.monotonic()
+        self.tree_generator.cancel_event.clear()
+        self.watcher = None
+        self.watch_status = None
+        self.worker = threading.Thread(target=self.generate_tree, args=(
             directory, exclude_input, show_metadata, follow_symlinks, 
-            filter_input, output_type))
-        thread.daemon = True
-        thread.start()
+            filter_input, output_type, include_input, use_gitignore, find_duplicates, watch))
+        self.worker.daemon = True
+        self.worker.start()
+        self.root.after(100, self.drain_queue)
+    
+    def cancel_generation(self):
+        self.cancel_button.configure(state="disabled")
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watch_status = "Stopping..."
+        else:
+            self.tree_generator.cancel()
+        self.status_var.set("Cancelling...")
     
     def generate_tree(self, directory, exclude_input, show_metadata, follow_symlinks, 
-                      filter_input, output_type):
+                      filter_input, output_type, include_input="", use_gitignore=False, find_duplicates=False,
+                      watch=False):
+        status = "Done"
         try:
             exclude_list = [item.strip() for item in exclude_input.split(',') if item.strip()] if exclude_input else []
+            include_list = [item.strip() for item in include_input.split(',') if item.strip()] if include_input else []
             
             file_filter = None
             if filter_input:
@@ -517,51 +2526,188 @@ class DirectoryTreeApp:
                 excluded_items=exclude_list,
                 show_metadata=show_metadata,
                 follow_symlinks=follow_symlinks,
-                file_filter=file_filter
+                file_filter=file_filter,
+                walk_mode="iterative",
+                include_patterns=include_list,
+                use_gitignore=use_gitignore,
+                find_duplicates=find_duplicates and not watch
             )
             
-            if output_type == "console":
-                output_lines = self.tree_generator.generate_tree(directory)
-                
-                self.root.after(0, lambda: self.update_output(
-                    f"Directory tree for: {directory}\n"
-                    f"Excluded items: {', '.join(exclude_list) if exclude_list else 'None'}\n"
-                    ".\n" + '\n'.join(output_lines)))
-            elif output_type == "text":
-                output_file = Path(directory) / "directory_tree.txt"
-                if self.tree_generator.export_to_file(directory, output_file, exclude_list):
-                    self.root.after(0, lambda: self.update_output(
-                        f"Directory tree exported to: {output_file}"))
-                else:
-                    self.root.after(0, lambda: self.update_output(
-                        f"Error exporting directory tree to: {output_file}"))
-            elif output_type == "html":
-                output_file = Path(directory) / "directory_tree.html"
-                if self.tree_generator.export_to_html(directory, output_file):
-                    self.root.after(0, lambda: self.update_output(
-                        f"HTML report generated at: {output_file}"))
-                else:
-                    self.root.after(0, lambda: self.update_output(
-                        f"Error generating HTML report at: {output_file}"))
+            if watch:
+                status = self.watch_tree(directory, output_type, exclude_list)
             else:
-                logger.error(f"Unknown output type: {output_type}")
-                self.root.after(0, lambda: self.update_output(
-                    f"Error: Unknown output type: {output_type}"))
-                
-            self.root.after(0, self.update_summary)
+                self.write_output(directory, output_type, exclude_list)
+                if self.tree_generator.cancel_event.is_set():
+                    status = "Cancelled"
+                self.ui_queue.put(("summary", None))
             
+        except WalkCancelled:
+            status = "Cancelled"
+            self.ui_queue.put(("summary", None))
         except Exception as e:
             logger.critical(f"Unhandled exception: {e}", exc_info=True)
-            self.root.after(0, lambda: self.update_output(f"Error: {str(e)}"))
+            self.ui_queue.put(("output", f"Error: {str(e)}"))
+            status = "Error"
         finally:
-            self.root.after(0, self.end_progress)
+            self.ui_queue.put(("done", status))
     
-    def update_output(self, text):
+    def write_output(self, directory, output_type, exclude_list, records=None):
+        if output_type == "console":
+            header = [f"Directory tree for: {directory}",
+                      f"Excluded items: {', '.join(exclude_list) if exclude_list else 'None'}",
+                      "."]
+            if records is not None:
+                self.ui_queue.put(("tree", header + list(self.tree_generator.render_lines(records))))
+                return
+            self.ui_queue.put(("lines", header))
+            self.stream_output(self.tree_generator.stream_tree(directory))
+            if self.tree_generator.duplicate_groups:
+                self.stream_output(["", "Duplicate files:", *self.tree_generator.duplicate_lines()])
+        elif output_type == "text":
+            output_file = Path(directory) / "directory_tree.txt"
+            if self.tree_generator.export_to_file(directory, output_file, exclude_list, records):
+                self.ui_queue.put(("output", f"Directory tree exported to: {output_file}"))
+            else:
+                self.ui_queue.put(("output", f"Error exporting directory tree to: {output_file}"))
+        elif output_type == "html":
+            output_file = Path(directory) / "directory_tree.html"
+            if self.tree_generator.export_to_html(directory, output_file, records):
+                self.ui_queue.put(("output", f"HTML report generated at: {output_file}"))
+            else:
+                self.ui_queue.put(("output", f"Error generating HTML report at: {output_file}"))
+        elif output_type == "ndjson":
+            output_file = Path(directory) / "directory_tree.ndjson"
+            if self.tree_generator.export_to_ndjson(directory, output_file, records):
+                self.ui_queue.put(("output", f"NDJSON export written to: {output_file}"))
+            else:
+                self.ui_queue.put(("output", f"Error exporting NDJSON to: {output_file}"))
+        elif output_type == "columnar":
+            output_file = Path(directory) / "directory_tree.dtc"
+            if self.tree_generator.export_to_columnar(directory, output_file, records=records):
+                self.ui_queue.put(("output", f"Columnar export written to: {output_file}"))
+            else:
+                self.ui_queue.put(("output", f"Error exporting columnar file to: {output_file}"))
+        else:
+            logger.error(f"Unknown output type: {output_type}")
+            self.ui_queue.put(("output", f"Error: Unknown output type: {output_type}"))
+    
+    def watch_tree(self, directory, output_type, exclude_list):
+        self.watcher = TreeWatcher(self.tree_generator, directory)
+        self.watcher.on_change = lambda changes: self.refresh_watch(directory, output_type, exclude_list, changes)
+        if output_type in self.OUTPUT_FILES:
+            self.watcher.ignore(Path(directory) / self.OUTPUT_FILES[output_type])
+            
+        self.watcher.build()
+        self.write_output(directory, output_type, exclude_list, self.watcher.records())
+        self.ui_queue.put(("summary", self.tree_generator.get_summary()))
+        self.ui_queue.put(("watching", f"Watching for changes ({self.watcher.source.name})..."))
+        self.watcher.run()
+        return "Stopped watching"
+    
+    def refresh_watch(self, directory, output_type, exclude_list, changes):
+        self.write_output(directory, output_type, exclude_list, self.watcher.records())
+        self.ui_queue.put(("summary", self.tree_generator.get_summary()))
+        self.ui_queue.put(("watching", f"Watching for changes ({self.watcher.source.name})... "
+                                       f"{len(changes)} changes applied in {self.watcher.last_update * 1000:.1f} ms"))
+    
+    def stream_output(self, lines, batch_size=1000, interval=0.1):
+        batch = []
+        flushed_at = time.monotonic()
+        try:
+            for line in lines:
+                batch.append(line)
+                if len(batch) >= batch_size or time.monotonic() - flushed_at >= interval:
+                    self.ui_queue.put(("lines", batch))
+                    batch = []
+                    flushed_at = time.monotonic()
+        finally:
+            self.ui_queue.put(("lines", batch))
+    
+    def drain_queue(self):
+        appended = False
+        done = None
+        while done is None:
+            try:
+                kind, payload = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "lines":
+                self.output_lines.extend(payload)
+                appended = True
+            elif kind == "tree":
+                self.output_lines = payload
+                appended = True
+            elif kind == "output":
+                self.update_output(payload)
+            elif kind == "summary":
+                self.update_summary(payload)
+            elif kind == "watching":
+                self.watch_status = payload
+                self.progress_bar.stop()
+            elif kind == "done":
+                done = payload
+                
+        if appended:
+            self.render_output()
+            
+        if done is not None:
+            self.end_progress(done)
+            return
+            
+        entries, pending_dirs = self.tree_generator.get_progress()
+        elapsed = max(time.monotonic() - self.started_at, 1e-6)
+        if self.watch_status is not None:
+            self.status_var.set(self.watch_status)
+        elif not self.tree_generator.cancel_event.is_set():
+            self.status_var.set(f"Processing... {entries:,} entries ({entries / elapsed:,.0f}/s), "
+                                f"{pending_dirs:,} directories remaining")
+        self.root.after(100, self.drain_queue)
+    
+    def visible_rows(self):
+        info = self.output_text.dlineinfo("1.0")
+        if info:
+            self.line_height = max(info[3], 1)
+        return max(1, self.output_text.winfo_height() // self.line_height - 1)
+    
+    def render_output(self):
+        rows = self.visible_rows()
+        total = len(self.output_lines)
+        self.view_start = max(0, min(self.view_start, total - rows))
+        
+        xview = self.output_text.xview()[0]
         self.output_text.delete("1.0", "end")
-        self.output_text.insert("1.0", text)
+        self.output_text.insert("1.0", '\n'.join(self.output_lines[self.view_start:self.view_start + rows]))
+        self.output_text.xview_moveto(xview)
+        
+        if total > rows:
+            self.output_scrollbar.set(self.view_start / total, (self.view_start + rows) / total)
+        else:
+            self.output_scrollbar.set(0, 1)
     
-    def update_summary(self):
-        summary = self.tree_generator.get_summary()
+    def scroll_output(self, action, value, unit=None):
+        if action == "moveto":
+            self.view_start = int(float(value) * len(self.output_lines))
+        elif unit == "pages":
+            self.view_start += int(float(value)) * self.visible_rows()
+        else:
+            self.view_start += int(float(value))
+        self.render_output()
+    
+    def on_output_wheel(self, event):
+        if event.num == 4 or (event.num != 5 and event.delta > 0):
+            self.scroll_output("scroll", -3, "units")
+        else:
+            self.scroll_output("scroll", 3, "units")
+        return "break"
+    
+    def update_output(self, text):
+        self.output_lines = text.split('\n') if text else []
+        self.view_start = 0
+        self.render_output()
+    
+    def update_summary(self, summary=None):
+        if summary is None:
+            summary = self.tree_generator.get_summary()
         
         self.summary_stats["total_files"].configure(text=f"Total Files: {summary['total_files']}")
         self.summary_stats["total_dirs"].configure(text=f"Total Directories: {summary['total_dirs']}")
@@ -569,18 +2715,251 @@ class DirectoryTreeApp:
         self.summary_stats["file_types"].configure(text=f"Top File Types: {summary['file_types']}")
         self.summary_stats["largest_file"].configure(text=f"Largest File: {summary['largest_file']}")
         self.summary_stats["newest_file"].configure(text=f"Newest File: {summary['newest_file']}")
+        self.summary_stats["duplicates"].configure(text=f"Duplicates: {summary.get('duplicates', '-')}")
+        self.summary_stats["heaviest_dirs"].configure(text=f"Heaviest Directories: {summary['heaviest_dirs']}")
+        self.summary_stats["largest_files"].configure(text=f"Largest Files: {summary['largest_files']}")
 
-    def end_progress(self):
+    def end_progress(self, status="Done"):
         self.progress_bar.stop()
-        self.status_var.set("Done")
+        self.generate_button.configure(state="normal")
+        self.cancel_button.configure(state="disabled")
+        
+        entries, _ = self.tree_generator.get_progress()
+        if self.watcher is not None:
+            self.status_var.set(f"{status}: {entries:,} entries")
+            return
+        elapsed = max(time.monotonic() - self.started_at, 1e-6)
+        self.status_var.set(f"{status}: {entries:,} entries in {elapsed:.1f}s ({entries / elapsed:,.0f}/s)")
         
     def run(self):
         try:
             self.run_gui()
         except Exception as e:
             logger.critical(f"Application crashed: {e}", exc_info=True)
+            from tkinter.messagebox import showerror
             showerror("Application Error", f"The application encountered an error:\n{str(e)}")
 
+class DirectoryTreeCLI(DirectoryTreeApp):
+    def build_parser(self):
+        parser = argparse.ArgumentParser(
+            prog="directory_tree_generator.py",
+            description="Generate a directory tree without the GUI. Run without arguments to open the GUI.")
+        parser.add_argument("directory", help="directory to scan")
+        parser.add_argument("-e", "--exclude", default="", help="comma-separated names or glob patterns to exclude")
+        parser.add_argument("-i", "--include", default="", help="comma-separated glob patterns to include")
+        parser.add_argument("-f", "--filter", default="", help="comma-separated file extensions to keep, e.g. .py,.md")
+        parser.add_argument("-m", "--metadata", action="store_true", help="show file size and modification time")
+        parser.add_argument("-s", "--follow-symlinks", action="store_true", help="follow symbolic links")
+        parser.add_argument("-g", "--gitignore", action="store_true", help="honor .gitignore files")
+        parser.add_argument("-t", "--output-type", default="console",
+                            choices=["console", "text", "html", "ndjson", "columnar"], help="output format")
+        parser.add_argument("-o", "--output", help="output file (defaults to directory_tree.<ext> inside the directory)")
+        parser.add_argument("--walk-mode", default="recursive", choices=["recursive", "iterative", "parallel"],
+                            help="directory walking strategy")
+        parser.add_argument("--max-depth", type=int, help="stop descending below this depth")
+        parser.add_argument("--workers", type=int, default=8, help="worker threads for the parallel walk mode")
+        parser.add_argument("--snapshot", help="snapshot cache file reused between runs")
+        parser.add_argument("--top", type=int, default=10, help="number of heaviest directories and largest files to report")
+        parser.add_argument("-d", "--duplicates", action="store_true", help="find duplicate files by content hash")
+        parser.add_argument("--hash-cache", help="hash cache file reused between duplicate scans")
+        parser.add_argument("--hash-workers", type=int,
+                            help="hashing processes for the duplicate scan (0 hashes in-process)")
+        parser.add_argument("--diff", metavar="SNAPSHOT", help="show what changed since a saved snapshot")
+        parser.add_argument("--diff-against", metavar="SNAPSHOT",
+                            help="compare --diff with this snapshot instead of the live tree")
+        parser.add_argument("--save-snapshot", metavar="SNAPSHOT",
+                            help="save a full snapshot of the live tree to diff against later")
+        parser.add_argument("-w", "--watch", action="store_true",
+                            help="keep running and refresh the output whenever files change")
+        parser.add_argument("--debounce", type=float, default=0.2,
+                            help="seconds to wait for changes to settle before refreshing in watch mode")
+        parser.add_argument("--poll", type=float, metavar="SECONDS",
+                            help="poll for changes every SECONDS instead of using inotify in watch mode")
+        parser.add_argument("-q", "--quiet", action="store_true", help="only log warnings and errors")
+        return parser
+    
+    def split_list(self, value):
+        return [item.strip() for item in value.split(',') if item.strip()] if value else []
+    
+    def run(self, argv=None):
+        parser = self.build_parser()
+        args = parser.parse_args(argv)
+        for handler in logging.getLogger().handlers:
+            if isinstance(handler, logging.StreamHandler):
+                handler.setStream(sys.stderr)
+        if args.quiet:
+            logger.setLevel(logging.WARNING)
+            
+        for value in (args.exclude, args.include):
+            valid, error_msg = self.validate_inputs(args.directory, value)
+            if not valid:
+                parser.error(error_msg)
+        if args.diff_against and not args.diff:
+            parser.error("--diff-against requires --diff")
+        if args.diff_against and args.save_snapshot:
+            parser.error("--save-snapshot cannot be combined with --diff-against")
+        if args.diff and args.output_type not in ("console", "text"):
+            parser.error("--diff writes console or text output only")
+        if args.watch and (args.diff or args.save_snapshot):
+            parser.error("--watch cannot be combined with --diff or --save-snapshot")
+        if args.watch and args.duplicates:
+            parser.error("--watch does not keep duplicate groups up to date, drop --duplicates")
+        if args.poll is not None and not args.watch:
+            parser.error("--poll requires --watch")
+                
+        exclude_list = self.split_list(args.exclude)
+        file_filter = [ext.lower() for ext in self.split_list(args.filter)] or None
+        self.tree_generator.set_options(
+            excluded_items=exclude_list,
+            show_metadata=args.metadata,
+            follow_symlinks=args.follow_symlinks,
+            file_filter=file_filter,
+            walk_mode=args.walk_mode,
+            max_depth=args.max_depth,
+            max_workers=args.workers,
+            snapshot_file=args.snapshot,
+            include_patterns=self.split_list(args.include),
+            use_gitignore=args.gitignore,
+            find_duplicates=args.duplicates,
+            hash_cache_file=args.hash_cache,
+            hash_workers=args.hash_workers,
+            top_n=args.top
+        )
+        
+        try:
+            if args.diff or args.save_snapshot:
+                return self.run_diff(args, exclude_list)
+            if args.watch:
+                return self.run_watch(args, exclude_list)
+            if args.output_type == "console":
+                output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+                try:
+                    output.write(f"Directory tree for: {args.directory}\n"
+                                 f"Excluded items: {', '.join(exclude_list) if exclude_list else 'None'}\n.\n")
+                    for line in self.tree_generator.stream_tree(args.directory):
+                        output.write(f"{line}\n")
+                    if self.tree_generator.duplicate_groups:
+                        output.write("\nDuplicate files:\n")
+                        for line in self.tree_generator.duplicate_lines():
+                            output.write(f"{line}\n")
+                finally:
+                    if output is not sys.stdout:
+                        output.close()
+                success = True
+            else:
+                output_file = args.output or Path(args.directory) / self.OUTPUT_FILES[args.output_type]
+                if args.output_type == "text":
+                    success = self.tree_generator.export_to_file(args.directory, output_file, exclude_list)
+                elif args.output_type == "html":
+                    success = self.tree_generator.export_to_html(args.directory, output_file)
+                elif args.output_type == "ndjson":
+                    success = self.tree_generator.export_to_ndjson(args.directory, output_file)
+                else:
+                    success = self.tree_generator.export_to_columnar(args.directory, output_file)
+        except BrokenPipeError:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 1
+        except Exception as e:
+            logger.error(f"Error generating directory tree: {e}")
+            return 1
+            
+        if not success:
+            return 1
+            
+        summary = self.tree_generator.get_summary()
+        logger.info(f"{summary['total_files']} files, {summary['total_dirs']} directories, {summary['total_size']}")
+        return 0
+    
+    def run_watch(self, args, exclude_list):
+        output_file = args.output
+        if args.output_type != "console" and not output_file:
+            output_file = Path(args.directory) / self.OUTPUT_FILES[args.output_type]
+            
+        watcher = TreeWatcher(self.tree_generator, args.directory, debounce=args.debounce,
+                              poll_interval=args.poll or 2.0, use_polling=args.poll is not None)
+        watcher.on_change = lambda changes: self.write_watch_output(args, exclude_list, watcher, output_file, changes)
+        if output_file:
+            watcher.ignore(output_file)
+            
+        watcher.build()
+        if not self.write_watch_output(args, exclude_list, watcher, output_file, []):
+            watcher.close()
+            return 1
+        logger.info(f"Watching {args.directory} for changes, press Ctrl+C to stop")
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            logger.info("Stopped watching")
+        return 0
+    
+    def write_watch_output(self, args, exclude_list, watcher, output_file, changes):
+        generator = self.tree_generator
+        if args.output_type == "console" and not output_file:
+            if changes:
+                stamp = datetime.now().strftime('%H:%M:%S')
+                for marker, record in changes:
+                    suffix = "/" if record["type"] == "dir" else ""
+                    sys.stdout.write(f"[{stamp}] {marker} {generator.relative_path(record['path'])}{suffix}\n")
+            else:
+                sys.stdout.write(f"Directory tree for: {args.directory}\n"
+                                 f"Excluded items: {', '.join(exclude_list) if exclude_list else 'None'}\n.\n")
+                for line in generator.render_lines(watcher.records()):
+                    sys.stdout.write(f"{line}\n")
+            sys.stdout.flush()
+            success = True
+        elif args.output_type == "console":
+            try:
+                with open(output_file, 'w', encoding='utf-8') as output:
+                    output.write(f"Directory tree for: {args.directory}\n"
+                                 f"Excluded items: {', '.join(exclude_list) if exclude_list else 'None'}\n.\n")
+                    for line in generator.render_lines(watcher.records()):
+                        output.write(f"{line}\n")
+                success = True
+            except OSError as e:
+                logger.error(f"Error writing {output_file}: {e}")
+                success = False
+        elif args.output_type == "text":
+            success = generator.export_to_file(args.directory, output_file, exclude_list, watcher.records())
+        elif args.output_type == "html":
+            success = generator.export_to_html(args.directory, output_file, watcher.records())
+        elif args.output_type == "ndjson":
+            success = generator.export_to_ndjson(args.directory, output_file, watcher.records())
+        else:
+            success = generator.export_to_columnar(args.directory, output_file, records=watcher.records())
+            
+        summary = generator.get_summary()
+        logger.info(f"{summary['total_files']} files, {summary['total_dirs']} directories, {summary['total_size']}")
+        return success
+
+    def run_diff(self, args, exclude_list):
+        if not args.diff:
+            listings = self.tree_generator.capture_listings(args.directory)
+            self.tree_generator.write_listings(args.save_snapshot, listings)
+            logger.info(f"Snapshot of {args.directory} saved to {args.save_snapshot} ({len(listings)} directories)")
+            return 0
+            
+        output_file = args.output
+        if args.output_type == "text" and not output_file:
+            output_file = Path(args.directory) / "directory_tree_diff.txt"
+        output = open(output_file, 'w', encoding='utf-8') if output_file else sys.stdout
+        try:
+            against = args.diff_against or "live tree"
+            output.write(f"Directory diff for: {args.directory}\n"
+                         f"Old snapshot: {args.diff}\n"
+                         f"New snapshot: {against}\n"
+                         f"Excluded items: {', '.join(exclude_list) if exclude_list else 'None'}\n.\n")
+            records = self.tree_generator.diff_tree(args.directory, args.diff, args.diff_against, args.save_snapshot)
+            for line in self.tree_generator.render_diff(records):
+                output.write(f"{line}\n")
+            counts = self.tree_generator.diff_counts
+            output.write(f"\n{counts['+']} added, {counts['-']} removed, {counts['~']} changed\n")
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        return 0
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(DirectoryTreeCLI().run())
     app = DirectoryTreeApp()
     app.run()
\ No newline at end of file
@@ -0,0 +1,441 @@
+import json
+import mmap
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+import pytest
+
+import directory_tree_generator
+from directory_tree_generator import (HASH_BLOCK_SIZE, DirectoryTreeApp, DirectoryTreeGenerator, InotifySource,
+                                      PollingSource, TreeColumns, TreeWatcher, WalkCancelled)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "a" / "b" / "deep.txt").write_text("deep")
+    (tmp_path / "a" / "one.py").write_text("print(1)")
+    (tmp_path / "z").mkdir()
+    (tmp_path / "z" / "big.bin").write_bytes(b"x" * 4096)
+    (tmp_path / "top.md").write_text("# top")
+    return tmp_path
+
+
+def build(directory, walk_mode):
+    generator = DirectoryTreeGenerator()
+    generator.set_options(walk_mode=walk_mode)
+    return generator.build_tree(directory)
+
+
+@pytest.mark.parametrize("walk_mode", ["iterative", "parallel"])
+def test_walk_modes_match_recursive(tree, walk_mode):
+    assert build(tree, walk_mode) == build(tree, "recursive")
+
+
+
+@pytest.fixture
+def slow_tree(tmp_path, monkeypatch):
+    for branch in range(6):
+        for leaf in range(6):
+            path = tmp_path / f"b{branch}" / f"l{leaf}"
+            path.mkdir(parents=True)
+            (path / f"f{branch}{leaf}.txt").write_text("x" * (branch * 6 + leaf))
+    list_directory = DirectoryTreeGenerator.list_directory
+    lock = threading.Lock()
+    listings = {"active": 0, "peak": 0}
+    
+    def slow_list_directory(self, directory):
+        with lock:
+            listings["active"] += 1
+            listings["peak"] = max(listings["peak"], listings["active"])
+        try:
+            time.sleep(0.02)
+            return list_directory(self, directory)
+        finally:
+            with lock:
+                listings["active"] -= 1
+                
+    monkeypatch.setattr(DirectoryTreeGenerator, "list_directory", slow_list_directory)
+    return tmp_path, listings
+
+
+def summarized_walk(directory, walk_mode):
+    generator = DirectoryTreeGenerator()
+    generator.set_options(walk_mode=walk_mode, max_workers=16)
+    lines = generator.build_tree(directory)
+    return lines, generator.get_summary()
+
+
+def test_parallel_walk_overlaps_slow_listings(slow_tree):
+    directory, listings = slow_tree
+    serial_lines, serial_summary = summarized_walk(directory, "recursive")
+    assert listings["peak"] == 1
+    
+    parallel_lines, parallel_summary = summarized_walk(directory, "parallel")
+    assert parallel_lines == serial_lines
+    assert parallel_summary == serial_summary
+    assert listings["peak"] > 1
+
+def test_parallel_walk_bounds_prefetch_window(tmp_path, monkeypatch):
+    for index in range(100):
+        (tmp_path / f"d{index:03}").mkdir()
+    counts = {"submitted": 0, "opened": 0, "peak": 0}
+    
+    class CountingExecutor(directory_tree_generator.ThreadPoolExecutor):
+        def submit(self, *args, **kwargs):
+            counts["submitted"] += 1
+            counts["peak"] = max(counts["peak"], counts["submitted"] - counts["opened"])
+            return super().submit(*args, **kwargs)
+            
+    open_directory = DirectoryTreeGenerator.open_directory
+    
+    def counting_open_directory(self, *args):
+        counts["opened"] += 1
+        return open_directory(self, *args)
+        
+    monkeypatch.setattr(directory_tree_generator, "ThreadPoolExecutor", CountingExecutor)
+    monkeypatch.setattr(DirectoryTreeGenerator, "open_directory", counting_open_directory)
+    generator = DirectoryTreeGenerator()
+    generator.set_options(walk_mode="parallel", max_workers=2)
+    lines = generator.build_tree(tmp_path)
+    
+    assert len(lines) == 100
+    assert counts["submitted"] == 101
+    assert counts["peak"] <= 2 * 2 + 1
+
+
+def test_unreadable_root_matches_across_walk_modes(tmp_path):
+    root = tmp_path / "notadir"
+    root.write_text("not a directory")
+    
+    recursive = build(root, "recursive")
+    assert recursive == build(root, "iterative")
+    assert recursive[0].startswith("notadir/ [error:")
+    assert DirectoryTreeGenerator().generate_tree(root) == recursive
+
+
+def test_heaviest_directories_skip_directories_not_entered(tree):
+    (tree / "z" / "link_a").symlink_to(tree / "a", target_is_directory=True)
+    (tree / "a" / "b" / "up").symlink_to(tree, target_is_directory=True)
+    
+    generator = DirectoryTreeGenerator()
+    generator.set_options(walk_mode="recursive")
+    generator.build_tree(tree)
+    heaviest = generator.get_heaviest_directories()
+    
+    assert [path for path, _, _ in heaviest] == ["z", "a", "a/b"]
+    assert heaviest[0][1:] == (4096, 1)
+
+
+def test_heaviest_directories_skip_directories_below_max_depth(tree):
+    generator = DirectoryTreeGenerator()
+    generator.set_options(walk_mode="iterative", max_depth=1)
+    generator.build_tree(tree)
+    
+    assert generator.get_heaviest_directories() == []
+
+
+@pytest.fixture
+def deep_tree(tmp_path):
+    path = tmp_path
+    for _ in range(1500):
+        path = path / "d"
+        path.mkdir()
+    yield tmp_path
+    while path != tmp_path:
+        path.rmdir()
+        path = path.parent
+
+
+def test_gui_worker_walks_deep_trees_iteratively(deep_tree):
+    app = DirectoryTreeApp()
+    app.generate_tree(deep_tree, "", False, False, "", "console")
+    lines = []
+    while not app.ui_queue.empty():
+        kind, payload = app.ui_queue.get()
+        if kind == "lines":
+            lines.extend(payload)
+            
+    assert len(lines) == 3 + 1500
+    assert app.tree_generator.walk_mode == "iterative"
+
+
+def test_cancel_before_walk_starts_is_kept(tree):
+    generator = DirectoryTreeGenerator()
+    generator.cancel()
+    
+    with pytest.raises(WalkCancelled):
+        generator.build_tree(tree)
+
+
+@pytest.mark.parametrize("export", ["export_to_file", "export_to_html", "export_to_ndjson", "export_to_columnar"])
+def test_exports_propagate_cancellation(tree, tmp_path_factory, export):
+    generator = DirectoryTreeGenerator()
+    generator.cancel()
+    output = tmp_path_factory.mktemp("out") / "export"
+    
+    with pytest.raises(WalkCancelled):
+        getattr(generator, export)(tree, output)
+
+
+GITIGNORE_FILES = {
+    ".gitignore": "# comment\n*.log\n!keep.log\n/build/\ndocs/**/*.tmp\ncache/\n\\#literal\n\\!bang\na/**/z.txt\n",
+    "sub/.gitignore": "!x.log\n*.md\n",
+    "app.log": "", "keep.log": "", "sub/x.log": "", "sub/keep.log": "", "sub/y.log": "",
+    "build/out.o": "", "sub/build/out.o": "",
+    "docs/n.tmp": "", "docs/a/b/n.tmp": "", "docs/n.txt": "",
+    "cache/c.bin": "", "sub/cache/c.bin": "", "other/cache": "",
+    "#literal": "", "!bang": "", "#other": "",
+    "a/z.txt": "", "a/b/c/z.txt": "", "a/y.txt": "",
+    "readme.md": "", "sub/readme.md": "",
+}
+
+GITIGNORE_KEPT = {
+    ".gitignore", "sub/.gitignore", "keep.log", "sub/x.log", "sub/keep.log", "sub/build/out.o", "docs/n.txt",
+    "other/cache", "#other", "a/y.txt", "readme.md",
+}
+
+
+@pytest.fixture
+def ignore_tree(tmp_path):
+    for name, content in GITIGNORE_FILES.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return tmp_path
+
+
+def walked_files(directory, **options):
+    generator = DirectoryTreeGenerator()
+    generator.set_options(**options)
+    return {os.path.relpath(record["path"], directory).replace(os.sep, "/")
+            for record in generator.stream_records(directory) if record["type"] == "file"}
+
+
+@pytest.mark.parametrize("walk_mode", ["recursive", "iterative", "parallel"])
+def test_gitignore_rules_match_expected_files(ignore_tree, walk_mode):
+    assert walked_files(ignore_tree, use_gitignore=True, walk_mode=walk_mode) == GITIGNORE_KEPT
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_gitignore_rules_match_git(ignore_tree):
+    env = dict(os.environ, HOME=str(ignore_tree), GIT_CONFIG_NOSYSTEM="1")
+    subprocess.run(["git", "init", "-q"], cwd=ignore_tree, env=env, check=True)
+    listed = subprocess.run(["git", "ls-files", "-co", "--exclude-standard"], cwd=ignore_tree, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    
+    assert walked_files(ignore_tree, use_gitignore=True, excluded_items=[".git"]) == set(listed.splitlines())
+
+
+def test_escaped_exclusions_are_accepted(ignore_tree):
+    app = DirectoryTreeApp()
+    
+    assert app.validate_inputs(ignore_tree, "\\#literal, \\!bang") == (True, "")
+    assert not {"#literal", "!bang"} & walked_files(ignore_tree, excluded_items=["\\#literal", "\\!bang"])
+
+
+@pytest.fixture
+def export_tree(tree):
+    (tree / "a" / "ü.txt").write_text("umlaut")
+    (tree / "a" / "b" / "up").symlink_to(tree, target_is_directory=True)
+    (tree / "dangling").symlink_to(tree / "missing")
+    return tree
+
+
+def metadata_generator():
+    generator = DirectoryTreeGenerator()
+    generator.set_options(show_metadata=True, follow_symlinks=True)
+    return generator
+
+
+def live_records(directory):
+    generator = metadata_generator()
+    records = list(generator.stream_records(directory))
+    return records, list(generator.render_lines(records))
+
+
+def test_ndjson_export_round_trips_to_the_text_tree(export_tree, tmp_path_factory):
+    records, lines = live_records(export_tree)
+    output = tmp_path_factory.mktemp("out") / "tree.ndjson"
+    generator = metadata_generator()
+    
+    assert generator.export_to_ndjson(export_tree, output)
+    
+    with open(output, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert rows[-1]["type"] == "summary"
+    assert rows[:-1] == records
+    assert list(metadata_generator().render_lines(rows[:-1])) == lines
+    assert any(record.get("target") for record in records) and any(record["error"] for record in records)
+
+
+def test_columnar_export_round_trips_through_mmap(export_tree, tmp_path_factory):
+    records, lines = live_records(export_tree)
+    output = tmp_path_factory.mktemp("out") / "tree.dtc"
+    generator = metadata_generator()
+    
+    assert generator.export_to_columnar(export_tree, output, chunk_size=2)
+    
+    columns = TreeColumns(output)
+    try:
+        assert isinstance(columns.map, mmap.mmap)
+        assert len(columns) == len(records)
+        assert list(columns) == records
+        assert list(metadata_generator().render_lines(columns)) == lines
+    finally:
+        columns.close()
+
+
+@pytest.fixture
+def duplicate_tree(tmp_path):
+    block = HASH_BLOCK_SIZE
+    head, middle, tail = b"h" * block, b"m" * block, b"t" * block
+    files = {
+        "small/one.txt": b"s" * 100, "small/two.txt": b"s" * 100, "small/other.txt": b"o" * 100,
+        "big/one.bin": head + middle + tail, "big/two.bin": head + middle + tail,
+        "big/tail.bin": head + middle + b"x" * block, "big/middle.bin": head + b"x" * block + tail,
+        "unique.txt": b"u" * 7,
+    }
+    for name, content in files.items():
+        path = tmp_path / "tree" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    return tmp_path / "tree"
+
+
+def scan_duplicates(directory, hash_cache_file):
+    generator = DirectoryTreeGenerator()
+    generator.set_options(find_duplicates=True, hash_cache_file=hash_cache_file, hash_workers=0)
+    generator.build_tree(directory)
+    groups = [(size, sorted(os.path.relpath(item[1], directory) for item in files))
+              for size, _, files in generator.duplicate_groups]
+    return groups, generator.hashed_files, generator.hash_cache_hits
+
+
+def test_duplicates_are_narrowed_by_size_partial_and_full_hash(duplicate_tree, tmp_path):
+    cache_file = tmp_path / "hashes.json"
+    expected = [(3 * HASH_BLOCK_SIZE, ["big/one.bin", "big/two.bin"]), (100, ["small/one.txt", "small/two.txt"])]
+    
+    assert scan_duplicates(duplicate_tree, cache_file) == (expected, 7 + 3, 0)
+    assert scan_duplicates(duplicate_tree, cache_file) == (expected, 0, 7 + 3)
+    
+    changed = duplicate_tree / "big" / "two.bin"
+    stats = changed.stat()
+    with open(changed, "r+b") as f:
+        f.seek(HASH_BLOCK_SIZE)
+        f.write(b"y")
+    os.utime(changed, ns=(stats.st_atime_ns, stats.st_mtime_ns + 10**9))
+    
+    assert scan_duplicates(duplicate_tree, cache_file) == (expected[1:], 2, 6 + 2)
+
+
+def save_listings(generator, directory, snapshot_file):
+    generator.write_listings(snapshot_file, generator.capture_listings(directory))
+
+
+def diff_changes(generator, directory, snapshot_file):
+    return {(os.path.relpath(record["path"], directory), record["change"])
+            for record in generator.diff_tree(directory, snapshot_file) if record["change"] != " "}
+
+
+def test_diff_reports_changes_and_skips_unchanged_subtrees(tree, tmp_path_factory, monkeypatch):
+    snapshot_file = tmp_path_factory.mktemp("snapshots") / "old.json"
+    generator = DirectoryTreeGenerator()
+    save_listings(generator, tree, snapshot_file)
+    old_signatures = generator.compute_signatures(generator.load_listings(snapshot_file), tree)
+    (tree / "a" / "new.txt").write_text("new")
+    (tree / "a" / "one.py").write_text("print('one')")
+    (tree / "top.md").unlink()
+    
+    diffed = []
+    diff_directory = generator.diff_directory
+    monkeypatch.setattr(generator, "diff_directory",
+                        lambda path, *args: diffed.append(os.path.relpath(path, tree)) or diff_directory(path, *args))
+    
+    assert diff_changes(generator, tree, snapshot_file) == {
+        ("a", "~"), ("a/new.txt", "+"), ("a/one.py", "~"), ("top.md", "-")}
+    assert diffed == [".", "a"]
+    new_signatures = generator.compute_signatures(generator.capture_listings(tree), tree)
+    assert old_signatures[str(tree / "z")] == new_signatures[str(tree / "z")]
+    assert old_signatures[str(tree / "a" / "b")] == new_signatures[str(tree / "a" / "b")]
+    assert old_signatures[str(tree / "a")] != new_signatures[str(tree / "a")]
+
+
+def test_diff_ignores_gitignored_and_out_of_depth_entries(tree, tmp_path_factory):
+    snapshot_file = tmp_path_factory.mktemp("snapshots") / "old.json"
+    (tree / ".gitignore").write_text("*.log\n")
+    generator = DirectoryTreeGenerator()
+    generator.set_options(use_gitignore=True, max_depth=2)
+    save_listings(generator, tree, snapshot_file)
+    (tree / "debug.log").write_text("ignored")
+    (tree / "a" / "b" / "new.txt").write_text("too deep")
+    
+    assert diff_changes(generator, tree, snapshot_file) == set()
+    
+    (tree / "a" / "two.py").write_text("print(2)")
+    assert diff_changes(generator, tree, snapshot_file) == {("a", "~"), ("a/two.py", "+")}
+
+
+def watched_tree(generator, watcher):
+    return list(generator.render_lines(watcher.records())), generator.get_summary()
+
+
+def fresh_tree(directory, show_metadata):
+    generator = DirectoryTreeGenerator()
+    generator.set_options(show_metadata=show_metadata)
+    lines = generator.build_tree(directory)
+    return lines, generator.get_summary()
+
+
+def change_tree(tree):
+    (tree / "a" / "new.txt").write_text("new")
+    (tree / "a" / "one.py").rename(tree / "z" / "one.py")
+    (tree / "a" / "b").rename(tree / "a" / "c")
+    (tree / "top.md").unlink()
+    (tree / "n" / "m").mkdir(parents=True)
+    (tree / "n" / "m" / "deep.txt").write_text("deep")
+
+
+@pytest.mark.parametrize("show_metadata", [False, True])
+@pytest.mark.parametrize("source", [PollingSource, InotifySource])
+def test_watcher_matches_a_fresh_walk(tree, source, show_metadata):
+    generator = DirectoryTreeGenerator()
+    generator.set_options(show_metadata=show_metadata)
+    watcher = TreeWatcher(generator, tree, poll_interval=0, use_polling=source is PollingSource)
+    watcher.build()
+    if not isinstance(watcher.source, source):
+        watcher.close()
+        pytest.skip("inotify is not available")
+    assert watched_tree(generator, watcher) == fresh_tree(tree, show_metadata)
+    
+    change_tree(tree)
+    changes = watcher.apply(watcher.source.wait(1))
+    
+    assert {(marker, os.path.relpath(record["path"], tree)) for marker, record in changes} >= {
+        ("+", "a/new.txt"), ("-", "a/one.py"), ("+", "z/one.py"), ("-", "a/b"), ("+", "a/c"), ("-", "top.md"),
+        ("+", "n")}
+    assert watched_tree(generator, watcher) == fresh_tree(tree, show_metadata)
+    watcher.close()
+
+
+def test_polling_watcher_reports_changes_from_its_loop(tree):
+    generator = DirectoryTreeGenerator()
+    reported = []
+    changed = threading.Event()
+    watcher = TreeWatcher(generator, tree, on_change=lambda changes: reported.extend(changes) or changed.set(),
+                          debounce=0.05, poll_interval=0.05, use_polling=True)
+    watcher.build()
+    thread = threading.Thread(target=watcher.run)
+    thread.start()
+    try:
+        (tree / "top.md").unlink()
+        assert changed.wait(5)
+    finally:
+        watcher.stop()
+        thread.join(5)
+        
+    assert [(marker, record["name"]) for marker, record in reported] == [("-", "top.md")]
+    assert not thread.is_alive()
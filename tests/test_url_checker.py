@@ -0,0 +1,588 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+import url_checker
+from url_checker import URLChecker
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SITE_PAGES = {
+    "/": '<a href="/a">a</a><a href="/a#top">a again</a><a href="/b">b</a><a href="/private/x">private</a>'
+         '<a href="/missing">missing</a><a href="{ext}/live">live</a><a href="{ext}/dead">dead</a>',
+    "/a": '<a href="/b">b</a><a href="/c">c</a><a href="/">home</a>',
+    "/b": '<a href="/d">d</a>',
+    "/c": '<p>no links</p>',
+    "/d": '<a href="/e">e</a>',
+    "/e": '<p>too deep</p>',
+    "/private/x": '<a href="/secret">secret</a>',
+}
+
+
+def serve(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    server.requests = Counter()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    
+    def log_message(self, *args):
+        pass
+        
+    def send(self, code, content_type, body):
+        body = body.encode()
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+            
+    def do_HEAD(self):
+        self.do_GET()
+        
+    def do_GET(self):
+        self.server.requests[(self.command, self.path)] += 1
+        if self.path == "/robots.txt":
+            return self.send(200, "text/plain", "User-agent: *\nDisallow: /private\n")
+        if self.path in ("/live", "/dead"):
+            return self.send(200 if self.path == "/live" else 404, "text/html", "ext")
+        page = SITE_PAGES.get(self.path)
+        if page is None:
+            return self.send(404, "text/html", "not found")
+        self.send(200, "text/html", "<html><body>" + page.format(ext=self.server.external) + "</body></html>")
+
+
+@pytest.fixture
+def site():
+    external = serve(SiteHandler)
+    external.external = ""
+    server = serve(SiteHandler)
+    server.external = f"http://127.0.0.1:{external.server_address[1]}"
+    yield server
+    for running in (server, external):
+        running.shutdown()
+        running.server_close()
+
+
+def make_checker(**options):
+    checker = URLChecker(**options)
+    checker.logs = []
+    checker.on_log = checker.logs.append
+    return checker
+
+
+def test_crawl_fetches_each_page_once_and_counts_only_fetched_pages(site):
+    checker = make_checker()
+    checker.crawl_depth = 2
+    base = f"http://127.0.0.1:{site.server_address[1]}/"
+    
+    results = list(checker.crawl_urls(base))
+    
+    page_gets = sorted(path for (method, path), count in site.requests.items() if method == "GET" and path != "/robots.txt")
+    assert page_gets == ["/", "/a", "/b", "/c", "/d", "/missing"]
+    assert all(count == 1 for count in site.requests.values())
+    assert ("GET", "/private/x") not in site.requests
+    assert checker.stats["total"] == len(results) == 9
+    assert ("HEAD", "/e") in site.requests
+    assert f"Crawl finished: {len(page_gets)} pages fetched, 10 unique URLs" in checker.logs
+    assert {result["url"].rsplit("/", 1)[1]: result["status"] for result in results if "/missing" in result["url"]
+            or result["url"].endswith(("/live", "/dead"))} == {"missing": "INVALID", "live": "VALID", "dead": "INVALID"}
+
+
+def test_crawl_respects_max_pages(site):
+    checker = make_checker()
+    checker.crawl_depth = 5
+    checker.max_pages = 3
+    
+    list(checker.crawl_urls(f"http://127.0.0.1:{site.server_address[1]}/"))
+    
+    page_gets = [path for (method, path) in site.requests if method == "GET" and path != "/robots.txt"]
+    assert len(page_gets) == 3
+
+
+def test_run_without_selenium_logs_and_finishes(monkeypatch):
+    for name in ("selenium", "selenium.webdriver", "selenium.webdriver.common.by"):
+        monkeypatch.setitem(sys.modules, name, None)
+    checker = make_checker(timeout=1)
+    finished = []
+    checker.on_finish = finished.append
+    
+    checker.run(["http://127.0.0.1:1/"])
+    
+    assert finished == [True]
+    assert checker.results == []
+    assert any(line.startswith("Browser collection needs selenium") for line in checker.logs)
+
+
+def test_run_finishes_when_checking_fails(monkeypatch):
+    def fail(base_urls):
+        raise RuntimeError("boom")
+        yield
+        
+    checker = make_checker()
+    finished = []
+    checker.on_finish = finished.append
+    monkeypatch.setattr(checker, "check_sites", fail)
+    
+    with pytest.raises(RuntimeError):
+        checker.run(["http://127.0.0.1:1/"])
+        
+    assert finished == [False]
+    assert "Scraping failed: boom" in checker.logs
+
+
+def test_brotli_is_advertised_only_when_it_can_be_decoded():
+    encodings = URLChecker().get_headers()["Accept-Encoding"].split(", ")
+    
+    assert encodings[:2] == ["gzip", "deflate"]
+    assert ("br" in encodings) == (url_checker.brotli is not None)
+
+
+@pytest.mark.parametrize("error", [requests.TooManyRedirects, requests.exceptions.ContentDecodingError,
+                                   requests.exceptions.InvalidURL])
+def test_half_open_probe_is_released_after_other_request_errors(error):
+    checker = make_checker()
+    checker.max_retries = 0
+    url = "http://example.invalid/page"
+    policy = checker.get_host_policy(url)
+    policy.failures = policy.failure_threshold
+    
+    def send(timeout):
+        raise error("probe failed")
+        
+    with pytest.raises(error):
+        checker.request_with_retries(url, send)
+        
+    assert not policy.probing
+    assert policy.allow()
+
+
+def test_cli_help_does_not_need_customtkinter():
+    script = ("import sys; sys.modules['customtkinter'] = None; sys.argv = ['url_checker.py', '--help']; "
+              "import runpy; runpy.run_path('url_checker.py', run_name='__main__')")
+    completed = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True)
+    
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.startswith("usage: url_checker.py")
+
+
+LINK_FIXTURE = '''<!doctype html><html><head><base href="https://cdn.test/root/"><title>x</title></head>
+<body><ul class="nav main"><li><a href="a.html">One &amp; <b>two</b></a><li><a href="/b" title="Bee"></a>
+<li><a href="https://other.test/c" id="cee">C</a></ul>
+<p>para <a href="d">D</a><div><a href='mailto:x'>mail</a><img src=x><a href="e"><img alt=""> E
+ text </a></div><br/><a>no href</a><a href="  f  ">F</a></body></html>'''
+
+
+def test_static_links_resolve_base_and_match_browser_locators():
+    links = URLChecker().extract_static_links(LINK_FIXTURE, "https://site.test/")
+    
+    assert links == [
+        ["https://cdn.test/root/a.html", "One & two", None, "//body[1]/ul[1]/li[1]/a[1]", "html > body > ul.nav.main > li > a"],
+        ["https://cdn.test/b", "", "Bee", "//body[1]/ul[1]/li[2]/a[1]", "html > body > ul.nav.main > li > a"],
+        ["https://other.test/c", "C", None, "//body[1]/ul[1]/li[3]/a[1]", "#cee"],
+        ["https://cdn.test/root/d", "D", None, "//body[1]/p[1]/a[1]", "html > body > p > a"],
+        ["mailto:x", "mail", None, "//body[1]/div[1]/a[1]", "html > body > div > a"],
+        ["https://cdn.test/root/e", "E text", None, "//body[1]/div[1]/a[2]", "html > body > div > a"],
+        [None, "no href", None, "//body[1]/a[1]", "html > body > a"],
+        ["https://cdn.test/root/f", "F", None, "//body[1]/a[2]", "html > body > a"],
+    ]
+    assert [url for url, *_ in URLChecker().filter_links(links)] == [
+        "https://cdn.test/root/a.html", "https://cdn.test/b", "https://other.test/c", "https://cdn.test/root/d",
+        "https://cdn.test/root/e", "https://cdn.test/root/f"]
+
+
+MODE_PAGES = {
+    "/static": ("text/html; charset=utf-8", '<html><body><a href="/x">x</a><script>1</script></body></html>'),
+    "/spa": ("text/html", '<html><body><div id="root"></div><script src="app.js"></script></body></html>'),
+    "/plain": ("text/html", "<html><body>nothing here</body></html>"),
+    "/json": ("application/json", "{}"),
+    "/meta": ("text/html", '<html><head><meta charset="utf-8"></head><body><a href="/über">Über uns</a></body></html>'),
+    "/header": ("text/html; charset=utf-8", '<html><body><a href="/über">Über uns</a></body></html>'),
+}
+
+
+class ModeHandler(SiteHandler):
+    def do_GET(self):
+        content_type, body = MODE_PAGES.get(self.path, ("text/html", "not found"))
+        self.send(200 if self.path in MODE_PAGES else 404, content_type, body)
+
+
+@pytest.mark.parametrize("mode, path, browser", [
+    ("auto", "/static", False), ("auto", "/spa", True), ("auto", "/plain", False), ("auto", "/json", True),
+    ("auto", "/gone", True), ("static", "/spa", False), ("static", "/gone", False), ("browser", "/static", True),
+])
+def test_browser_is_started_only_when_static_html_is_not_enough(mode, path, browser):
+    server = serve(ModeHandler)
+    checker = make_checker(collection_mode=mode)
+    checker.collect_browser_urls = lambda base_url: [("BROWSER", "", "", "")]
+    try:
+        urls_info = checker.collect_urls(f"http://127.0.0.1:{server.server_address[1]}{path}")
+    finally:
+        server.shutdown()
+        server.server_close()
+        
+    assert (urls_info == [("BROWSER", "", "", "")]) == browser
+
+
+@pytest.mark.parametrize("path", ["/meta", "/header"])
+def test_static_links_decode_non_ascii_pages(path):
+    server = serve(ModeHandler)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        urls_info = make_checker(collection_mode="static").collect_urls(base + path)
+    finally:
+        server.shutdown()
+        server.server_close()
+        
+    assert [(url, title) for url, title, _, _ in urls_info] == [(base + "/über", "Über uns")]
+
+
+def test_crawl_queues_non_ascii_links_decoded():
+    server = serve(ModeHandler)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    checker = make_checker()
+    checker.crawl_depth = 1
+    try:
+        results = list(checker.crawl_urls(base + "/meta"))
+    finally:
+        server.shutdown()
+        server.server_close()
+        
+    assert [(result["url"], result["title"]) for result in results] == [(base + "/meta", "Base URL"),
+                                                                        (base + "/über", "Über uns")]
+
+
+class RetryHandler(SiteHandler):
+    def do_GET(self):
+        self.server.requests[(self.command, self.path)] += 1
+        code, retry_after = self.server.replies.pop(0) if self.server.replies else (200, None)
+        body = b"ok"
+        self.send_response(code)
+        if retry_after is not None:
+            self.send_header("Retry-After", retry_after)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+
+@pytest.fixture
+def retry_server():
+    server = serve(RetryHandler)
+    server.replies = []
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(url_checker.time, "sleep", delays.append)
+    return delays
+
+
+def test_retry_after_is_honored_before_retrying(retry_server, sleeps):
+    retry_server.replies = [(503, "2"), (429, None)]
+    checker = make_checker()
+    checker.backoff_base = 0.25
+    
+    result = checker.check_url(f"http://127.0.0.1:{retry_server.server_address[1]}/page", "page", "", "")
+    
+    assert result["code"] == 200
+    assert retry_server.requests[("HEAD", "/page")] == 3
+    assert sleeps[0] == 2.0
+    assert 0 <= sleeps[1] <= 0.5
+
+
+def test_long_retry_after_returns_the_response(retry_server, sleeps):
+    retry_server.replies = [(503, "3600")]
+    
+    result = make_checker().check_url(f"http://127.0.0.1:{retry_server.server_address[1]}/page", "page", "", "")
+    
+    assert result["code"] == 503
+    assert retry_server.requests[("HEAD", "/page")] == 1
+    assert sleeps == []
+
+
+def test_breaker_fails_dead_hosts_fast(sleeps):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    checker = make_checker()
+    attempts = []
+    probe_url = checker.probe_url
+    checker.probe_url = lambda *args, **kwargs: attempts.append(args[0]) or probe_url(*args, **kwargs)
+    
+    first = checker.check_url(f"http://127.0.0.1:{port}/a", "a", "", "")
+    second = checker.check_url(f"http://127.0.0.1:{port}/b", "b", "", "")
+    
+    assert first["status"] == second["status"] == "UNDETECTABLE"
+    assert len(attempts) == checker.failure_threshold == len(sleeps) + 1
+    assert f"127.0.0.1:{port} looks down after 3 failures, failing its links fast for 30s" in checker.logs
+
+
+def test_retried_responses_are_closed(retry_server, sleeps):
+    retry_server.replies = [(503, "0"), (503, "0")]
+    checker = make_checker()
+    checker.session = checker.create_session()
+    url = f"http://127.0.0.1:{retry_server.server_address[1]}/page"
+    responses = []
+    
+    def send(timeout):
+        responses.append(checker.session.get(url, timeout=timeout, stream=True))
+        return responses[-1]
+        
+    final = checker.request_with_retries(url, send)
+    
+    assert [response.raw.closed for response in responses[:-1]] == [True, True]
+    assert final.status_code == 200 and not final.raw.closed
+    final.close()
+
+
+class ProbeHandler(SiteHandler):
+    def do_HEAD(self):
+        self.server.requests[(self.command, self.path)] += 1
+        if self.path.startswith("/nohead"):
+            return self.send(int(self.path[len("/nohead"):] or 405), "text/html", "")
+        self.do_GET()
+        
+    def do_GET(self):
+        if self.command == "GET":
+            self.server.requests[(self.command, self.path)] += 1
+        with self.server.lock:
+            self.server.active += 1
+            self.server.peak = max(self.server.peak, self.server.active)
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.active -= 1
+        etag = self.server.etag
+        if etag is not None and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            return self.end_headers()
+        code = 404 if self.path.startswith("/missing") else 200
+        body = b"ok"
+        self.send_response(code)
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+
+@pytest.fixture
+def probe_server():
+    server = serve(ProbeHandler)
+    server.lock = threading.Lock()
+    server.active = server.peak = 0
+    server.latency = 0
+    server.etag = None
+    server.base = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_concurrent_checks_respect_the_per_host_limit(probe_server):
+    probe_server.latency = 0.05
+    checker = make_checker(max_workers=16, per_host_limit=3)
+    urls_info = [(f"{probe_server.base}/{'missing' if index % 4 == 0 else 'page'}{index}", f"link {index}", "", "")
+                 for index in range(20)]
+    
+    results = list(checker.check_urls(urls_info))
+    
+    assert probe_server.peak == 3
+    assert sorted(result["url"] for result in results) == sorted(url for url, *_ in urls_info)
+    assert checker.stats == {"valid": 15, "invalid": 5, "undetectable": 0, "total": 0}
+
+
+@pytest.mark.parametrize("path, head_code", [("/nohead405", 405), ("/nohead501", 501), ("/page", None)])
+def test_head_falls_back_to_get_only_when_unsupported(probe_server, path, head_code):
+    result = make_checker().check_url(probe_server.base + path, "page", "", "")
+    
+    assert result["code"] == 200
+    assert probe_server.requests[("HEAD", path)] == 1
+    assert probe_server.requests[("GET", path)] == (1 if head_code else 0)
+
+
+def test_link_cache_hits_and_revalidates_with_etag(probe_server, tmp_path):
+    cache_file = str(tmp_path / "links.json")
+    probe_server.etag = '"v1"'
+    url = probe_server.base + "/page"
+    
+    def check(**options):
+        checker = make_checker(cache_file=cache_file, **options)
+        checker.load_cache()
+        result = checker.check_url(url, "page", "", "")
+        checker.save_cache()
+        return result["code"], result["cache"], probe_server.requests[("HEAD", "/page")]
+        
+    assert check() == (200, "miss", 1)
+    assert check() == (200, "hit", 1)
+    assert check(cache_ttl=0) == (200, "revalidated", 2)
+    probe_server.etag = '"v2"'
+    assert check(cache_ttl=0) == (200, "miss", 3)
+    assert check() == (200, "hit", 3)
+
+
+@pytest.mark.parametrize("url, normalized", [
+    ("HTTP://Example.COM:80/a/?utm_source=x&q=1#frag", "http://example.com/a?q=1"),
+    ("https://user@Example.com:443/", "https://user@example.com/"),
+    ("http://example.com:8080/a?fbclid=1&GCLID=2", "http://example.com:8080/a"),
+    ("http://example.com/a/b/?b=2&a=1", "http://example.com/a/b?b=2&a=1"),
+    ("http://example.com/A", "http://example.com/A"),
+])
+def test_normalize_url(url, normalized):
+    assert URLChecker().normalize_url(url) == normalized
+
+
+def test_duplicate_links_are_checked_once_and_fanned_out(probe_server):
+    base = probe_server.base
+    urls_info = [(f"{base}/page", "plain", "//a[1]", "a"), (f"{base}/page/#top", "fragment", "//a[2]", "b"),
+                 (f"{base}/page?utm_source=mail", "tracked", "//a[3]", "c"), (f"{base}/missing", "missing", "//a[4]", "d"),
+                 (f"{base}/missing#x", "missing again", "//a[5]", "e")]
+    checker = make_checker()
+    
+    results = list(checker.check_urls(urls_info))
+    
+    assert sorted((result["url"], result["title"], result["xpath"], result["code"]) for result in results) == sorted(
+        (url, title, xpath, 404 if "missing" in url else 200) for url, title, xpath, _ in urls_info)
+    assert probe_server.requests[("HEAD", "/page")] == probe_server.requests[("HEAD", "/missing")] == 1
+    assert sum(probe_server.requests.values()) == 2
+    assert checker.stats["valid"] == 3 and checker.stats["invalid"] == 2
+    assert "Checking 2 unique targets for 5 links" in checker.logs
+
+
+class StubDriver:
+    def __init__(self, number):
+        self.number = number
+        self.pages = []
+        self.broken = False
+        self.quit_calls = 0
+        
+    def get(self, url):
+        if self.broken:
+            raise RuntimeError("browser crashed")
+        self.pages.append(url)
+        
+    def execute_script(self, script):
+        if self.broken:
+            raise RuntimeError("browser crashed")
+        return "complete"
+        
+    def quit(self):
+        self.quit_calls += 1
+
+
+def stub_pool(max_drivers=1, max_pages=50):
+    drivers = []
+    
+    def factory():
+        drivers.append(StubDriver(len(drivers)))
+        return drivers[-1]
+        
+    return url_checker.DriverPool(factory, max_drivers, max_pages), drivers
+
+
+def test_driver_pool_reuses_and_recycles_browsers():
+    pool, drivers = stub_pool(max_pages=3)
+    
+    used = []
+    for _ in range(4):
+        driver = pool.acquire()
+        used.append(driver.number)
+        pool.release(driver)
+        
+    assert used == [0, 0, 0, 1]
+    assert pool.started == 2
+    assert drivers[0].quit_calls == 1 and drivers[1].quit_calls == 0
+    assert drivers[0].pages == ["about:blank"] * 3
+
+
+def test_driver_pool_replaces_unhealthy_browsers():
+    pool, drivers = stub_pool()
+    driver = pool.acquire()
+    pool.release(driver)
+    driver.broken = True
+    
+    assert pool.acquire() is drivers[1]
+    assert drivers[0].quit_calls == 1
+    drivers[1].broken = True
+    pool.release(drivers[1])
+    assert drivers[1].quit_calls == 1
+    assert pool.acquire() is drivers[2]
+
+
+def test_driver_pool_limits_browsers_and_closes_them():
+    pool, drivers = stub_pool(max_drivers=1)
+    first = pool.acquire()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()), daemon=True)
+    waiter.start()
+    waiter.join(0.2)
+    assert acquired == []
+    
+    pool.release(first)
+    waiter.join(5)
+    assert acquired == [first]
+    pool.close()
+    
+    assert first.quit_calls == 1
+    pool.release(first)
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+
+
+def test_a_finished_run_does_not_close_the_next_runs_pool(monkeypatch):
+    checker = make_checker()
+    pools = []
+    releases = [threading.Event(), threading.Event()]
+    
+    def check_sites(base_urls):
+        index = len(pools)
+        pools.append(checker.driver_pool)
+        releases[index].wait(5)
+        return iter(())
+        
+    def start_run():
+        count = len(pools)
+        checker.running = True
+        thread = threading.Thread(target=checker.run, args=(["http://127.0.0.1:1/"],))
+        thread.start()
+        while len(pools) == count:
+            time.sleep(0.01)
+        return thread
+        
+    monkeypatch.setattr(checker, "check_sites", check_sites)
+    first = start_run()
+    checker.running = False
+    checker.close_drivers()
+    second = start_run()
+    releases[0].set()
+    first.join(5)
+    
+    assert pools[0].closed
+    assert not pools[1].closed
+    assert checker.driver_pool is pools[1]
+    
+    releases[1].set()
+    second.join(5)
+    assert pools[1].closed
+    assert checker.driver_pool is None
@@ -1,176 +1,594 @@
-import customtkinter as ctk
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 import requests
-from urllib.parse import urljoin, urlparse
+from requests.adapters import HTTPAdapter
+from urllib.parse import urljoin, urlparse, urldefrag
+from urllib.robotparser import RobotFileParser
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from collections import deque
+from email.utils import parsedate_to_datetime
+import hashlib
+import queue
+import random
 import threading
+import time
 import webbrowser
 import json
+import csv
+import sys
+import argparse
+import logging
 from datetime import datetime
 import os
+import re
 import contextlib
 
-class URLCheckerGUI(ctk.CTk):
-    def __init__(self):
-        super().__init__()
-        self.title("URL Checker — /HFerrahoglu")
-        self.geometry("1000x700")
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+HEAD_FALLBACK_CODES = (405, 501)
+RETRY_STATUS_CODES = (429, 503)
+LINK_CACHE_VERSION = 2
+LINK_CACHE_MAX_AGE = 30 * 24 * 3600
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+TRACKING_PARAMETERS = ('gclid', 'dclid', 'fbclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid', '_ga', '_gl')
+TRACKING_PREFIXES = ('utm_',)
+META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+ACCEPT_ENCODING = 'gzip, deflate, br' if brotli is not None else 'gzip, deflate'
+logger = logging.getLogger('url_checker')
+
+CSS_SELECTOR_FUNCTION = """
+    function generateSelector(el) {
+        if (el.id) return '#' + el.id;
+        if (el.className) return '.' + el.className.replace(/ /g, '.');
         
-        self.checker = URLChecker()
-        self.checker.gui = self
-        self.running = False
-        self.table_rows = []
+        let path = [];
+        while (el.nodeType === Node.ELEMENT_NODE) {
+            let selector = el.nodeName.toLowerCase();
+            if (el.className) {
+                selector += '.' + el.className.replace(/ /g, '.');
+            }
+            path.unshift(selector);
+            el = el.parentNode;
+        }
+        return path.join(' > ');
+    }
+"""
+
+def run_gui():
+    import customtkinter as ctk
+    
+    class URLCheckerGUI(ctk.CTk):
+        def __init__(self):
+            super().__init__()
+            self.title("URL Checker — /HFerrahoglu")
+            self.geometry("1000x700")
+        
+            self.checker = URLChecker()
+            self.checker.on_log = lambda message: self.ui_queue.put(("log", message))
+            self.checker.on_result = lambda result: self.ui_queue.put(("result", result))
+            self.checker.on_finish = lambda completed: self.ui_queue.put(("done", completed))
+            self.running = False
+            self.ui_queue = queue.Queue()
+            self.table_rows = []
+            self.table_results = []
+            self.search_index = []
+            self.filtered_rows = []
+            self.view_start = 0
+            self.row_height = 30
+            self.search_term = ""
+            self.search_job = None
         
-        self.setup_gui()
+            self.setup_gui()
+            self.after(100, self.drain_queue)
 
-    def setup_gui(self):
-        header_frame = ctk.CTkFrame(self, fg_color="#1a2526")
-        header_frame.pack(pady=(10, 0), padx=10, fill="x")
+        def setup_gui(self):
+            header_frame = ctk.CTkFrame(self, fg_color="#1a2526")
+            header_frame.pack(pady=(10, 0), padx=10, fill="x")
         
-        ctk.CTkLabel(
-            header_frame,
-            text="URL Checker",
-            font=("Arial", 24, "bold"),
-            text_color="white"
-        ).pack(pady=10)
+            ctk.CTkLabel(
+                header_frame,
+                text="URL Checker",
+                font=("Arial", 24, "bold"),
+                text_color="white"
+            ).pack(pady=10)
         
-        control_frame = ctk.CTkFrame(self, fg_color="#2b3b3c")
-        control_frame.pack(pady=(5, 10), padx=10, fill="x")
+            control_frame = ctk.CTkFrame(self, fg_color="#2b3b3c")
+            control_frame.pack(pady=(5, 10), padx=10, fill="x")
         
-        ctk.CTkLabel(control_frame, text="Base URL:", text_color="white", font=("Arial", 12)).pack(side="left", padx=5)
-        self.url_entry = ctk.CTkEntry(control_frame, width=300, placeholder_text="https://example.com", font=("Arial", 12))
-        self.url_entry.pack(side="left", padx=5)
+            ctk.CTkLabel(control_frame, text="Base URL:", text_color="white", font=("Arial", 12)).pack(side="left", padx=5)
+            self.url_entry = ctk.CTkEntry(control_frame, width=300, placeholder_text="https://example.com", font=("Arial", 12))
+            self.url_entry.pack(side="left", padx=5)
         
-        self.start_btn = ctk.CTkButton(control_frame, text="Start Scraping", command=self.start_scraping, font=("Arial", 12))
-        self.start_btn.pack(side="left", padx=5)
+            ctk.CTkLabel(control_frame, text="Depth:", text_color="white", font=("Arial", 12)).pack(side="left", padx=5)
+            self.depth_entry = ctk.CTkEntry(control_frame, width=40, placeholder_text="0", font=("Arial", 12))
+            self.depth_entry.pack(side="left", padx=5)
         
-        self.stop_btn = ctk.CTkButton(control_frame, text="Stop Scraping", command=self.stop_scraping, state="disabled", font=("Arial", 12))
-        self.stop_btn.pack(side="left", padx=5)
+            self.start_btn = ctk.CTkButton(control_frame, text="Start Scraping", command=self.start_scraping, font=("Arial", 12))
+            self.start_btn.pack(side="left", padx=5)
         
-        self.export_btn = ctk.CTkButton(control_frame, text="Export Results", command=self.export_results, state="disabled", font=("Arial", 12))
-        self.export_btn.pack(side="left", padx=5)
+            self.stop_btn = ctk.CTkButton(control_frame, text="Stop Scraping", command=self.stop_scraping, state="disabled", font=("Arial", 12))
+            self.stop_btn.pack(side="left", padx=5)
         
-        self.loader = ctk.CTkProgressBar(control_frame, width=30, height=30, mode="indeterminate", corner_radius=15)
-        self.loader.pack(side="left", padx=5)
-        self.loader.set(0)
-        self.loader.stop()
-        self.loader.pack_forget()
+            self.export_btn = ctk.CTkButton(control_frame, text="Export Results", command=self.export_results, state="disabled", font=("Arial", 12))
+            self.export_btn.pack(side="left", padx=5)
         
-        self.search_entry = ctk.CTkEntry(control_frame, placeholder_text="Search URLs...", width=200, font=("Arial", 12))
-        self.search_entry.pack(side="right", padx=5)
-        self.search_entry.bind("<KeyRelease>", self.filter_urls)
+            self.loader = ctk.CTkProgressBar(control_frame, width=30, height=30, mode="indeterminate", corner_radius=15)
+            self.loader.pack(side="left", padx=5)
+            self.loader.set(0)
+            self.loader.stop()
+            self.loader.pack_forget()
         
-        results_frame = ctk.CTkFrame(self)
-        results_frame.pack(pady=10, padx=10, fill="both", expand=True)
+            self.search_entry = ctk.CTkEntry(control_frame, placeholder_text="Search URLs...", width=200, font=("Arial", 12))
+            self.search_entry.pack(side="right", padx=5)
+            self.search_entry.bind("<KeyRelease>", self.filter_urls)
         
-        self.table = ctk.CTkScrollableFrame(results_frame)
-        self.table.pack(fill="both", expand=True)
+            results_frame = ctk.CTkFrame(self)
+            results_frame.pack(pady=10, padx=10, fill="both", expand=True)
         
-        headers = ["#", "Status", "Title", "URL", "Code", "XPath"]
-        for i, header in enumerate(headers):
-            ctk.CTkLabel(self.table, text=header, font=("Arial", 12, "bold"), text_color="white").grid(row=0, column=i, padx=2, pady=2, sticky="w")
+            self.table_scrollbar = ctk.CTkScrollbar(results_frame, command=self.scroll_table)
+            self.table_scrollbar.pack(side="right", fill="y", pady=5)
         
-        self.log_text = ctk.CTkTextbox(self, height=150, text_color="white")
-        self.log_text.pack(pady=10, padx=10, fill="x")
+            self.table = ctk.CTkFrame(results_frame, fg_color="transparent")
+            self.table.pack(fill="both", expand=True)
+            self.table.grid_propagate(False)
+            for column, width in enumerate((50, 150, 220, 0, 50, 260)):
+                self.table.grid_columnconfigure(column, minsize=width, weight=1 if column == 3 else 0)
         
-        self.status_bar = ctk.CTkLabel(self, text="Ready", anchor="w", text_color="white")
-        self.status_bar.pack(fill="x", padx=10, pady=5)
+            headers = ["#", "Status", "Title", "URL", "Code", "XPath"]
+            for i, header in enumerate(headers):
+                ctk.CTkLabel(self.table, text=header, font=("Arial", 12, "bold"), text_color="white").grid(row=0, column=i, padx=2, pady=2, sticky="w")
+            
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                self.table.bind(sequence, self.on_table_wheel)
+            self.table.bind("<Configure>", lambda event: self.render_table())
+        
+            self.log_text = ctk.CTkTextbox(self, height=150, text_color="white")
+            self.log_text.pack(pady=10, padx=10, fill="x")
+        
+            self.status_bar = ctk.CTkLabel(self, text="Ready", anchor="w", text_color="white")
+            self.status_bar.pack(fill="x", padx=10, pady=5)
 
-    def log(self, message):
-        self.log_text.insert("end", f"{datetime.now().strftime('%H:%M:%S')} - {message}\n")
-        self.log_text.see("end")
+        def log(self, message):
+            self.log_text.insert("end", f"{datetime.now().strftime('%H:%M:%S')} - {message}\n")
+            self.log_text.see("end")
         
-    def start_scraping(self):
-        if not self.running and self.url_entry.get():
-            self.running = True
-            self.start_btn.configure(state="disabled")
-            self.stop_btn.configure(state="normal")
-            self.export_btn.configure(state="disabled")
-            self.status_bar.configure(text="Scraping in progress...")
+        def start_scraping(self):
+            if not self.running and self.url_entry.get():
+                self.running = True
+                self.start_btn.configure(state="disabled")
+                self.stop_btn.configure(state="normal")
+                self.export_btn.configure(state="disabled")
+                self.status_bar.configure(text="Scraping in progress...")
             
-            self.loader.pack(side="left", padx=5)
-            self.loader.start()
+                self.loader.pack(side="left", padx=5)
+                self.loader.start()
             
-            self.clear_table()
-            self.checker.results = []
+                self.clear_table()
+                self.checker.results = []
+                depth = self.depth_entry.get().strip()
+                self.checker.crawl_depth = int(depth) if depth.isdigit() else 0
+                self.checker.running = True
             
-            thread = threading.Thread(target=self.checker.run, args=(self.url_entry.get(),))
-            thread.start()
+                thread = threading.Thread(target=self.checker.run, args=([self.url_entry.get()],))
+                thread.start()
             
-    def stop_scraping(self):
-        if self.running:
-            self.running = False
-            if self.checker.driver:
-                self.checker.driver.quit()
-            self.start_btn.configure(state="normal")
-            self.stop_btn.configure(state="disabled")
-            self.status_bar.configure(text="Scraping stopped")
+        def stop_scraping(self):
+            if self.running:
+                self.running = False
+                self.checker.running = False
+                self.checker.close_drivers()
+                self.start_btn.configure(state="normal")
+                self.stop_btn.configure(state="disabled")
+                self.status_bar.configure(text="Scraping stopped")
             
-            self.loader.stop()
-            self.loader.pack_forget()
+                self.loader.stop()
+                self.loader.pack_forget()
             
-    def export_results(self):
-        if self.checker.results:
-            base_url_safe = self.checker.base_url.replace("http://", "").replace("https://", "").replace("/", "_")
-            filename = f"{base_url_safe}_detailed_results.json"
-            with open(filename, 'w') as f:
-                json.dump(self.checker.results, f, indent=4)
-            self.log(f"Results exported to {filename}")
+        def export_results(self):
+            if self.checker.results:
+                base_url_safe = self.checker.base_url.replace("http://", "").replace("https://", "").replace("/", "_")
+                filename = f"{base_url_safe}_detailed_results.json"
+                with open(filename, 'w') as f:
+                    json.dump(self.checker.results, f, indent=4)
+                self.log(f"Results exported to {filename}")
             
-    def clear_table(self):
-        for row in self.table_rows:
-            for widget in row:
-                widget.destroy()
-        self.table_rows = []
+        def clear_table(self):
+            while True:
+                try:
+                    self.ui_queue.get_nowait()
+                except queue.Empty:
+                    break
+            self.table_results = []
+            self.search_index = []
+            self.filtered_rows = []
+            self.view_start = 0
+            self.render_table()
             
-    def filter_urls(self, event):
-        search_term = self.search_entry.get().lower()
-        filtered_results = [r for r in self.checker.results if search_term in r['url'].lower() or 
-                           search_term in r['status'].lower()]
+        def filter_urls(self, event):
+            if self.search_job is not None:
+                self.after_cancel(self.search_job)
+            self.search_job = self.after(250, self.apply_filter)
         
-        self.clear_table()
-        for idx, result in enumerate(filtered_results, 1):
-            self.append_result(idx, result)
-            
-    def append_result(self, idx, result):
-        status_color = {"VALID": "#00FF00", "INVALID": "#FF0000", "UNDETECTABLE": "#FFFF00"}.get(result['status'], "#FFFFFF")
+        def apply_filter(self):
+            self.search_job = None
+            self.search_term = self.search_entry.get().lower()
+            if self.search_term:
+                self.filtered_rows = [i for i, text in enumerate(self.search_index) if self.search_term in text]
+            else:
+                self.filtered_rows = list(range(len(self.table_results)))
+            self.view_start = 0
+            self.render_table()
         
-        row_widgets = []
-        row_widgets.append(ctk.CTkLabel(self.table, text=str(idx), text_color="white"))
-        row_widgets[-1].grid(row=idx, column=0, padx=2, pady=2, sticky="w")
+        def add_results(self, results):
+            for result in results:
+                text = f"{result['url']}\n{result['status']}".lower()
+                if not self.search_term or self.search_term in text:
+                    self.filtered_rows.append(len(self.table_results))
+                self.table_results.append(result)
+                self.search_index.append(text)
+            self.render_table()
         
-        row_widgets.append(ctk.CTkLabel(self.table, text=result['status'], text_color=status_color))
-        row_widgets[-1].grid(row=idx, column=1, padx=2, pady=2, sticky="w")
+        def drain_queue(self):
+            results = []
+            status = None
+            for _ in range(5000):
+                try:
+                    kind, payload = self.ui_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == "result":
+                    results.append(payload)
+                    stats = self.checker.stats
+                    status = f"Checking - Valid: {stats['valid']} | Invalid: {stats['invalid']} | Undetectable: {stats['undetectable']}"
+                elif kind == "log":
+                    self.log(payload)
+                elif kind == "done":
+                    stats = self.checker.stats
+                    if payload:
+                        status = f"Completed - Valid: {stats['valid']} | Invalid: {stats['invalid']} | Undetectable: {stats['undetectable']}"
+                    else:
+                        status = "Scraping failed, see the log" if self.running else "Scraping stopped"
+                    self.finish_run(payload)
+                
+            if results:
+                self.add_results(results)
+            if status is not None:
+                self.status_bar.configure(text=status)
+            self.after(100, self.drain_queue)
         
-        row_widgets.append(ctk.CTkLabel(self.table, text=result['title'], text_color="white"))
-        row_widgets[-1].grid(row=idx, column=2, padx=2, pady=2, sticky="w")
+        def finish_run(self, completed):
+            self.running = False
+            self.start_btn.configure(state="normal")
+            self.stop_btn.configure(state="disabled")
+            self.export_btn.configure(state="normal")
+            self.loader.stop()
+            self.loader.pack_forget()
         
-        url_btn = ctk.CTkButton(self.table, text=result['url'], command=lambda u=result['url']: webbrowser.open(u),
-                              fg_color="transparent", text_color="#1E90FF", hover_color="#555555")
-        url_btn.grid(row=idx, column=3, padx=2, pady=2, sticky="w")
-        row_widgets.append(url_btn)
+        def visible_table_rows(self):
+            rows = max(1, self.table.winfo_height() // self.row_height - 1)
+            while len(self.table_rows) < rows:
+                offset = len(self.table_rows)
+                row_widgets = [ctk.CTkLabel(self.table, text="", text_color="white", anchor="w") for _ in range(5)]
+                row_widgets.insert(3, ctk.CTkButton(self.table, text="", command=lambda o=offset: self.open_row(o), anchor="w",
+                                                    fg_color="transparent", text_color="#1E90FF", hover_color="#555555"))
+                for column, widget in enumerate(row_widgets):
+                    widget.grid(row=offset + 1, column=column, padx=2, pady=1, sticky="w")
+                    for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                        widget.bind(sequence, self.on_table_wheel)
+                self.table_rows.append(row_widgets)
+            return rows
         
-        row_widgets.append(ctk.CTkLabel(self.table, text=str(result['code']), text_color="white"))
-        row_widgets[-1].grid(row=idx, column=4, padx=2, pady=2, sticky="w")
+        def shorten(self, text, limit):
+            text = str(text)
+            return text if len(text) <= limit else text[:limit - 1] + "…"
         
-        row_widgets.append(ctk.CTkLabel(self.table, text=result['xpath'], text_color="white"))
-        row_widgets[-1].grid(row=idx, column=5, padx=2, pady=2, sticky="w")
+        def render_table(self):
+            rows = self.visible_table_rows()
+            total = len(self.filtered_rows)
+            self.view_start = max(0, min(self.view_start, total - rows))
         
-        self.table_rows.append(row_widgets)
+            for offset, row_widgets in enumerate(self.table_rows):
+                position = self.view_start + offset
+                if offset >= rows or position >= total:
+                    for widget in row_widgets:
+                        widget.configure(text="")
+                    continue
+                
+                result = self.table_results[self.filtered_rows[position]]
+                status_color = {"VALID": "#00FF00", "INVALID": "#FF0000", "UNDETECTABLE": "#FFFF00"}.get(result['status'], "#FFFFFF")
+                status_text = f"{result['status']} (cached)" if result.get('cache') in ('hit', 'revalidated') else result['status']
+                row_widgets[0].configure(text=str(position + 1))
+                row_widgets[1].configure(text=status_text, text_color=status_color)
+                row_widgets[2].configure(text=self.shorten(result['title'], 40))
+                row_widgets[3].configure(text=self.shorten(result['url'], 90))
+                row_widgets[4].configure(text=str(result['code']))
+                row_widgets[5].configure(text=self.shorten(result['xpath'], 50))
+            
+            if total > rows:
+                self.table_scrollbar.set(self.view_start / total, (self.view_start + rows) / total)
+            else:
+                self.table_scrollbar.set(0, 1)
+            
+        def scroll_table(self, action, value, unit=None):
+            if action == "moveto":
+                self.view_start = int(float(value) * len(self.filtered_rows))
+            elif unit == "pages":
+                self.view_start += int(float(value)) * self.visible_table_rows()
+            else:
+                self.view_start += int(float(value))
+            self.render_table()
+        
+        def on_table_wheel(self, event):
+            if event.num == 4 or (event.num != 5 and event.delta > 0):
+                self.scroll_table("scroll", -3, "units")
+            else:
+                self.scroll_table("scroll", 3, "units")
+            return "break"
+        
+        def open_row(self, offset):
+            position = self.view_start + offset
+            if position < len(self.filtered_rows):
+                webbrowser.open(self.table_results[self.filtered_rows[position]]['url'])
+    
+    ctk.set_appearance_mode("dark")
+    ctk.set_default_color_theme("blue")
+    app = URLCheckerGUI()
+    app.mainloop()
+
+class LinkExtractor(HTMLParser):
+    VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source',
+                 'track', 'wbr'}
+    SELF_CLOSING_TAGS = {'li', 'dt', 'dd', 'tr', 'td', 'th', 'option', 'p'}
+    BLOCK_TAGS = {'address', 'article', 'aside', 'blockquote', 'div', 'dl', 'fieldset', 'footer', 'form', 'h1', 'h2',
+                  'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'ul'}
+
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.stack = [['', '', '', {}, '']]
+        self.links = []
+        self.link = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or '' for name, value in attrs}
+        if tag == 'base' and attrs.get('href'):
+            self.base_url = urljoin(self.base_url, attrs['href'])
+            
+        top = self.stack[-1][0]
+        if top == 'p' and tag in self.BLOCK_TAGS or top == tag and tag in self.SELF_CLOSING_TAGS:
+            self.close_element()
+            
+        parent = self.stack[-1]
+        parent[3][tag] = parent[3].get(tag, 0) + 1
+        if tag == 'html' and len(self.stack) == 1:
+            xpath = ''
+        else:
+            xpath = f"{parent[2] + '/' if parent[2] else ''}{tag}[{parent[3][tag]}]"
+        element = [tag, attrs.get('id', ''), xpath, {}, attrs.get('class', '')]
         
-        self.table.update()
+        if tag == 'a' and self.link is None:
+            self.link = [attrs, [], '//' + xpath, self.get_css_selector(element)]
+        if tag not in self.VOID_TAGS:
+            self.stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in self.VOID_TAGS:
+            self.close_element()
+
+    def handle_endtag(self, tag):
+        if not any(element[0] == tag for element in self.stack[1:]):
+            return
+        while self.close_element() != tag:
+            pass
+
+    def handle_data(self, data):
+        if self.link is not None:
+            self.link[1].append(data)
+
+    def close_element(self):
+        tag = self.stack.pop()[0]
+        if tag == 'a' and self.link is not None:
+            attrs, text, xpath, css_selector = self.link
+            href = urljoin(self.base_url, attrs['href'].strip()) if 'href' in attrs else None
+            self.links.append([href, ' '.join(''.join(text).split()), attrs.get('title'), xpath, css_selector])
+            self.link = None
+        return tag
+
+    def get_css_selector(self, element):
+        if element[1]:
+            return '#' + element[1]
+        if element[4]:
+            return '.' + element[4].replace(' ', '.')
+            
+        path = []
+        for tag, _, _, _, class_name in self.stack[1:] + [element]:
+            path.append(tag + ('.' + class_name.replace(' ', '.') if class_name else ''))
+        return ' > '.join(path)
+
+    def close(self):
+        super().close()
+        while len(self.stack) > 1:
+            self.close_element()
+
+
+class HostPolicy:
+    def __init__(self, max_timeout, min_timeout=3.0, failure_threshold=3, cooldown=30.0):
+        self.max_timeout = max_timeout
+        self.min_timeout = min_timeout
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.latency = None
+        self.deviation = 0.0
+        self.failures = 0
+        self.open_until = 0.0
+        self.probing = False
+
+    def get_timeout(self):
+        with self.lock:
+            if self.latency is None:
+                return self.max_timeout
+            return min(self.max_timeout, max(self.min_timeout, self.latency + 4 * self.deviation))
+
+    def allow(self):
+        with self.lock:
+            if self.failures < self.failure_threshold:
+                return True
+            if self.probing or time.monotonic() < self.open_until:
+                return False
+            self.probing = True
+            return True
+
+    def record_success(self, latency):
+        with self.lock:
+            if self.latency is None:
+                self.latency = latency
+                self.deviation = latency / 2
+            else:
+                self.deviation = 0.75 * self.deviation + 0.25 * abs(self.latency - latency)
+                self.latency = 0.875 * self.latency + 0.125 * latency
+            self.failures = 0
+            self.probing = False
+
+    def release(self):
+        with self.lock:
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if self.failures >= self.failure_threshold:
+                self.open_until = time.monotonic() + self.cooldown
+            return self.failures == self.failure_threshold
+
+
+class DriverPool:
+    def __init__(self, factory, max_drivers=2, max_pages=50):
+        self.factory = factory
+        self.max_drivers = max_drivers
+        self.max_pages = max_pages
+        self.lock = threading.Lock()
+        self.slots = threading.Semaphore(max_drivers)
+        self.idle = []
+        self.active = {}
+        self.started = 0
+        self.closed = False
+
+    def acquire(self):
+        self.slots.acquire()
+        try:
+            while True:
+                with self.lock:
+                    if self.closed:
+                        raise RuntimeError("Browser pool is closed")
+                    driver, pages = self.idle.pop() if self.idle else (None, 0)
+                if driver is not None and not self.is_healthy(driver):
+                    self.quit_driver(driver)
+                    continue
+                if driver is None:
+                    driver = self.factory()
+                    with self.lock:
+                        self.started += 1
+                with self.lock:
+                    self.active[driver] = pages
+                    closed = self.closed
+                if closed:
+                    self.quit_driver(driver)
+                    raise RuntimeError("Browser pool is closed")
+                return driver
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def release(self, driver):
+        try:
+            driver.get("about:blank")
+            healthy = True
+        except Exception:
+            healthy = False
+        with self.lock:
+            pages = self.active.pop(driver, self.max_pages) + 1
+            keep = healthy and not self.closed and pages < self.max_pages
+            if keep:
+                self.idle.append((driver, pages))
+        if not keep:
+            self.quit_driver(driver)
+        self.slots.release()
+
+    def is_healthy(self, driver):
+        try:
+            return driver.execute_script("return document.readyState") is not None
+        except Exception:
+            return False
+
+    def quit_driver(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            drivers = [driver for driver, _ in self.idle] + list(self.active)
+            self.idle = []
+        for driver in drivers:
+            self.quit_driver(driver)
+
 
 class URLChecker:
-    def __init__(self):
+    def __init__(self, max_workers=16, per_host_limit=4, timeout=10, collection_mode="auto", cache_file=None,
+                 cache_ttl=24 * 3600, negative_ttl=3600):
         self.stats = {'valid': 0, 'invalid': 0, 'undetectable': 0, 'total': 0}
         self.results = []
-        self.driver = None
+        self.driver_pool = None
+        self.max_drivers = 2
+        self.driver_max_pages = 50
         self.base_url = None
-        self.gui = None
+        self.running = True
+        self.on_log = None
+        self.on_result = None
+        self.on_finish = None
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.collection_mode = collection_mode
+        self.crawl_depth = 0
+        self.max_pages = 1000
+        self.crawl_delay = 0.0
+        self.respect_robots = True
+        self.robots = {}
+        self.host_next = {}
+        self.cache_file = cache_file
+        self.cache_ttl = cache_ttl
+        self.negative_ttl = negative_ttl
+        self.cache_lock = threading.Lock()
+        self.link_cache = {}
+        self.host_failures = {}
+        self.session = None
+        self.stats_lock = threading.Lock()
+        self.host_lock = threading.Lock()
+        self.host_slots = {}
+        self.host_policies = {}
+        self.max_retries = 2
+        self.backoff_base = 0.5
+        self.max_backoff = 10.0
+        self.max_retry_after = 30.0
+        self.failure_threshold = 3
+        self.breaker_cooldown = 30.0
+
+    def log(self, message):
+        if self.on_log is not None:
+            self.on_log(message)
+        else:
+            logger.info(message)
 
     def format_timestamp(self):
         return datetime.now().strftime("%H:%M:%S %d/%m/%Y")
@@ -184,13 +602,101 @@ class URLChecker:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
+            'Accept-Encoding': ACCEPT_ENCODING,
             'Connection': 'keep-alive',
             'DNT': '1',
             'Upgrade-Insecure-Requests': '1'
         }
 
+    def create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update(self.get_headers())
+        return session
+
+    def get_host_slot(self, url):
+        host = urlparse(url).netloc.lower()
+        with self.host_lock:
+            slot = self.host_slots.get(host)
+            if slot is None:
+                slot = threading.Semaphore(self.per_host_limit)
+                self.host_slots[host] = slot
+            return slot
+
+    def get_host_policy(self, url):
+        host = urlparse(url).netloc.lower()
+        with self.host_lock:
+            policy = self.host_policies.get(host)
+            if policy is None:
+                policy = HostPolicy(self.timeout, failure_threshold=self.failure_threshold, cooldown=self.breaker_cooldown)
+                self.host_policies[host] = policy
+            return policy
+
+    def get_retry_after(self, response):
+        value = response.headers.get('Retry-After', '').strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def get_backoff(self, attempt):
+        return random.uniform(0, min(self.max_backoff, self.backoff_base * 2 ** attempt))
+
+    def record_host_failure(self, url, policy):
+        if not policy.record_failure():
+            return
+        host = urlparse(url).netloc.lower()
+        self.log(f"{host} looks down after {policy.failures} failures, failing its links fast for {policy.cooldown:.0f}s")
+        if self.cache_file:
+            with self.cache_lock:
+                self.host_failures[host] = time.time()
+
+    def request_with_retries(self, url, send):
+        policy = self.get_host_policy(url)
+        for attempt in range(self.max_retries + 1):
+            with self.get_host_slot(url):
+                if not policy.allow():
+                    raise requests.ConnectionError(f"Circuit open for {urlparse(url).netloc}")
+                try:
+                    started = time.monotonic()
+                    response = send(policy.get_timeout())
+                    latency = time.monotonic() - started
+                except requests.Timeout:
+                    self.record_host_failure(url, policy)
+                    raise
+                except requests.ConnectionError:
+                    self.record_host_failure(url, policy)
+                    if attempt == self.max_retries:
+                        raise
+                    delay = self.get_backoff(attempt)
+                except requests.RequestException:
+                    policy.release()
+                    raise
+                else:
+                    policy.record_success(latency)
+                    if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                        return response
+                    delay = self.get_retry_after(response)
+                    if delay is None:
+                        delay = self.get_backoff(attempt)
+                    elif delay > self.max_retry_after:
+                        return response
+                    response.close()
+            time.sleep(delay)
+
+    def count_result(self, key):
+        with self.stats_lock:
+            self.stats[key] += 1
+
     def setup_driver(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        
         chrome_options = Options()
         chrome_options.add_argument('--headless')
         chrome_options.add_argument('--no-sandbox')
@@ -202,11 +708,32 @@ class URLChecker:
         with contextlib.redirect_stdout(None), contextlib.redirect_stderr(None):
             return webdriver.Chrome(service=service, options=chrome_options)
 
-    def get_xpath(self, element):
+    def create_driver_pool(self):
+        return DriverPool(self.setup_driver, self.max_drivers, self.driver_max_pages)
+
+    def get_driver_pool(self):
+        with self.host_lock:
+            if self.driver_pool is None:
+                self.driver_pool = self.create_driver_pool()
+            return self.driver_pool
+
+    def close_drivers(self, pool=None):
+        with self.host_lock:
+            if pool is None:
+                pool = self.driver_pool
+            elif self.driver_pool is pool:
+                self.driver_pool = None
+        if pool is not None and not pool.closed:
+            pool.close()
+            self.log(f"Closed browser pool ({pool.started} browsers started)")
+
+    def get_xpath(self, driver, element):
+        from selenium.webdriver.common.by import By
+        
         components = []
         child = element
         try:
-            root = self.driver.find_element(By.TAG_NAME, "html")
+            root = driver.find_element(By.TAG_NAME, "html")
             while child != root:
                 siblings = child.find_elements(By.XPATH, f"preceding-sibling::{child.tag_name}")
                 components.insert(0, f"{child.tag_name}[{len(siblings) + 1}]")
@@ -215,148 +742,647 @@ class URLChecker:
         except:
             return "N/A"
 
-    def get_css_selector(self, element):
+    def get_css_selector(self, driver, element):
         try:
-            return self.driver.execute_script("""
-                function generateSelector(el) {
-                    if (el.id) return '#' + el.id;
-                    if (el.className) return '.' + el.className.replace(/ /g, '.');
-                    
-                    let path = [];
-                    while (el.nodeType === Node.ELEMENT_NODE) {
-                        let selector = el.nodeName.toLowerCase();
-                        if (el.className) {
-                            selector += '.' + el.className.replace(/ /g, '.');
-                        }
-                        path.unshift(selector);
-                        el = el.parentNode;
-                    }
-                    return path.join(' > ');
-                }
-                return generateSelector(arguments[0]);
-            """, element)
+            return driver.execute_script(CSS_SELECTOR_FUNCTION + "return generateSelector(arguments[0]);", element)
         except:
             return "N/A"
 
-    def check_url(self, url, title, xpath, css_selector):
+    def probe_url(self, url, headers=None, timeout=None):
+        response = self.session.head(
+            url,
+            headers=headers,
+            allow_redirects=True,
+            timeout=timeout or self.timeout,
+            verify=True
+        )
+        response.close()
+        if response.status_code not in HEAD_FALLBACK_CODES:
+            return response
+            
+        response = self.session.get(
+            url,
+            headers=headers,
+            allow_redirects=True,
+            timeout=timeout or self.timeout,
+            verify=True,
+            stream=True
+        )
+        response.close()
+        return response
+
+    def load_cache(self):
+        self.link_cache = {}
+        self.host_failures = {}
+        if not self.cache_file:
+            return
+            
         try:
-            response = requests.get(
-                url,
-                headers=self.get_headers(),
-                allow_redirects=True,
-                timeout=10,
-                verify=True
-            )
-            status_code = response.status_code
-            timestamp = self.format_timestamp()
-            path = self.get_path_from_url(url)
-
-            if 200 <= status_code < 400:
-                self.stats['valid'] += 1
-                return {
-                    'timestamp': timestamp,
-                    'status': 'VALID',
-                    'path': path,
-                    'code': status_code,
-                    'url': url,
-                    'title': title,
-                    'xpath': xpath,
-                    'css_selector': css_selector
-                }
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == LINK_CACHE_VERSION:
+                self.link_cache = data["links"]
+                self.host_failures = data["hosts"]
             else:
-                self.stats['invalid'] += 1
-                return {
-                    'timestamp': timestamp,
-                    'status': 'INVALID',
-                    'path': path,
-                    'code': status_code,
-                    'url': url,
-                    'title': title,
-                    'xpath': xpath,
-                    'css_selector': css_selector
+                self.log(f"Ignoring link cache with unsupported version: {self.cache_file}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.log(f"Ignoring unreadable link cache {self.cache_file}: {str(e)}")
+
+    def save_cache(self):
+        if not self.cache_file:
+            return
+            
+        now = time.time()
+        with self.cache_lock:
+            links = {key: entry for key, entry in self.link_cache.items() if now - entry['checked'] < LINK_CACHE_MAX_AGE}
+            hosts = {host: failed_at for host, failed_at in self.host_failures.items() if now - failed_at < self.negative_ttl}
+        try:
+            temp_file = f"{self.cache_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({"version": LINK_CACHE_VERSION, "links": links, "hosts": hosts}, f, separators=(',', ':'))
+            os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            self.log(f"Error saving link cache {self.cache_file}: {str(e)}")
+            return
+            
+        counts = {}
+        for result in self.results:
+            counts[result['cache']] = counts.get(result['cache'], 0) + 1
+        self.log(f"Link cache saved to {self.cache_file}: {counts.get('hit', 0)} hits, "
+                     f"{counts.get('revalidated', 0)} revalidated, {counts.get('miss', 0)} checked")
+
+    def revalidation_headers(self, entry):
+        headers = {}
+        if entry is not None and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry is not None and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers or None
+
+    def extract_links(self, driver):
+        return driver.execute_script(CSS_SELECTOR_FUNCTION + """
+            const root = document.documentElement;
+            const paths = new Map();
+            function generateXPath(el) {
+                if (el === root) return '';
+                if (paths.has(el)) return paths.get(el);
+                const tag = el.tagName.toLowerCase();
+                let index = 1;
+                for (let sibling = el.previousElementSibling; sibling; sibling = sibling.previousElementSibling) {
+                    if (sibling.tagName.toLowerCase() === tag) index++;
                 }
-        except requests.RequestException:
-            self.stats['undetectable'] += 1
-            timestamp = self.format_timestamp()
-            return {
-                'timestamp': timestamp,
-                'status': 'UNDETECTABLE',
-                'path': self.get_path_from_url(url),
-                'code': 'N/A',
-                'url': url,
-                'title': title,
-                'xpath': xpath,
-                'css_selector': css_selector
+                const parent = generateXPath(el.parentElement);
+                const path = (parent ? parent + '/' : '') + tag + '[' + index + ']';
+                paths.set(el, path);
+                return path;
             }
+            return Array.from(document.getElementsByTagName('a'), function (link) {
+                let xpath = 'N/A';
+                let selector = 'N/A';
+                try { xpath = '//' + generateXPath(link); } catch (e) {}
+                try { selector = generateSelector(link); } catch (e) {}
+                return [link.href, (link.innerText || '').trim(), link.getAttribute('title'), xpath, selector];
+            });
+        """)
 
-    def collect_urls(self, base_url):
+    def make_result(self, url, status_code, title, xpath, css_selector, source=None, cache=None):
+        if status_code is None:
+            status = 'UNDETECTABLE'
+        elif 200 <= status_code < 400:
+            status = 'VALID'
+        else:
+            status = 'INVALID'
+        self.count_result(status.lower())
+        return {
+            'timestamp': self.format_timestamp(),
+            'status': status,
+            'path': self.get_path_from_url(url),
+            'code': 'N/A' if status_code is None else status_code,
+            'url': url,
+            'title': title,
+            'xpath': xpath,
+            'css_selector': css_selector,
+            'source': self.base_url if source is None else source,
+            'cache': cache or ('miss' if self.cache_file else 'off')
+        }
+
+    def check_url(self, url, title, xpath, css_selector, source=None):
+        if self.session is None:
+            self.session = self.create_session()
+            
+        key = self.normalize_url(url)
+        host = urlparse(url).netloc.lower()
+        entry = None
+        if self.cache_file:
+            now = time.time()
+            with self.cache_lock:
+                failed_at = self.host_failures.get(host)
+                entry = self.link_cache.get(key)
+            if failed_at is not None and now - failed_at < self.negative_ttl:
+                return self.make_result(url, None, title, xpath, css_selector, source, 'hit')
+            if entry is not None and now - entry['checked'] < self.cache_ttl:
+                return self.make_result(url, entry['code'], title, xpath, css_selector, source, 'hit')
+                
+        response = None
+        headers = self.revalidation_headers(entry)
+        try:
+            response = self.request_with_retries(url, lambda timeout: self.probe_url(url, headers, timeout))
+            status_code = response.status_code
+        except requests.RequestException:
+            status_code = None
+            
+        cache = None
+        if status_code == 304 and entry is not None:
+            status_code = entry['code']
+            cache = 'revalidated'
+        if self.cache_file and status_code is not None:
+            with self.cache_lock:
+                self.link_cache[key] = {
+                    'code': status_code,
+                    'checked': time.time(),
+                    'etag': response.headers.get('ETag') or (entry or {}).get('etag'),
+                    'last_modified': response.headers.get('Last-Modified') or (entry or {}).get('last_modified')
+                }
+        return self.make_result(url, status_code, title, xpath, css_selector, source, cache)
+
+    def filter_links(self, links):
         urls_info = []
+        for href, text, title, xpath, css_selector in links:
+            if href and (href.startswith('http://') or href.startswith('https://')):
+                urls_info.append((href, text or title or 'No Title', xpath, css_selector))
+        return urls_info
+
+    def extract_static_links(self, page, base_url):
+        parser = LinkExtractor(base_url)
+        parser.feed(page)
+        parser.close()
+        return parser.links
+
+    def read_page(self, response):
+        if 'charset=' not in response.headers.get('Content-Type', '').lower():
+            match = META_CHARSET.search(response.content[:4096])
+            response.encoding = match.group(1).decode('ascii') if match else response.apparent_encoding
+        return response.text
+
+    def needs_browser(self, page, urls_info):
+        return not urls_info and '<script' in page.lower()
+
+    def collect_static_urls(self, base_url):
+        if self.session is None:
+            self.session = self.create_session()
+        try:
+            response = self.session.get(base_url, allow_redirects=True, timeout=self.timeout, verify=True)
+        except requests.RequestException as e:
+            self.log(f"Could not fetch {base_url} without a browser: {str(e)}")
+            return None
+            
+        content_type = response.headers.get('Content-Type', '')
+        if response.status_code >= 400 or 'html' not in content_type.lower():
+            self.log(f"Static fetch returned {response.status_code} ({content_type or 'no content type'})")
+            return None
+            
+        page = self.read_page(response)
+        urls_info = self.filter_links(self.extract_static_links(page, response.url))
+        if self.collection_mode == "auto" and self.needs_browser(page, urls_info):
+            self.log("Page has no static links but runs scripts, rendering it in the browser")
+            return None
+        return urls_info
+
+    def collect_urls(self, base_url):
         self.base_url = base_url
+        self.log(f"Collecting URLs from {base_url}")
         
-        self.gui.log(f"Collecting URLs from {base_url}")
-        self.driver = self.setup_driver()
+        if self.collection_mode != "browser":
+            urls_info = self.collect_static_urls(base_url)
+            if urls_info is not None:
+                self.log(f"Collected {len(urls_info)} links from static HTML")
+                return urls_info
+            if self.collection_mode == "static":
+                return []
+                
+        return self.collect_browser_urls(base_url)
+
+    def collect_sites(self, base_urls):
+        self.log(f"Collecting URLs from {len(base_urls)} sites")
+        if self.collection_mode == "browser":
+            collected = [None] * len(base_urls)
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                collected = list(executor.map(self.collect_static_urls, base_urls))
+                
+        if self.collection_mode != "static":
+            rendered = [index for index, site_info in enumerate(collected) if site_info is None]
+            with ThreadPoolExecutor(max_workers=self.max_drivers) as executor:
+                for index, site_info in zip(rendered, executor.map(self.collect_browser_urls, [base_urls[i] for i in rendered])):
+                    collected[index] = site_info
+                    
+        urls_info = []
+        for base_url, site_info in zip(base_urls, collected):
+            self.log(f"Collected {len(site_info or [])} links from {base_url}")
+            urls_info.extend(info + (base_url,) for info in site_info or [])
+        return urls_info
+
+    def check_sites(self, base_urls):
+        if self.crawl_depth > 0:
+            for base_url in base_urls:
+                if not self.running:
+                    return
+                yield from self.crawl_urls(base_url)
+            return
+            
+        urls_info = self.collect_urls(base_urls[0]) if len(base_urls) == 1 else self.collect_sites(base_urls)
+        self.stats['total'] = len(urls_info)
+        yield from self.check_urls(urls_info)
+
+    def collect_browser_urls(self, base_url):
+        urls_info = []
+        try:
+            from selenium.webdriver.common.by import By
+            from selenium.webdriver.support.ui import WebDriverWait
+            from selenium.webdriver.support import expected_conditions as EC
+        except ImportError as e:
+            self.log(f"Browser collection needs selenium, skipping {base_url}: {str(e)}")
+            return urls_info
+            
+        if not self.running:
+            return urls_info
+        pool = self.get_driver_pool()
         try:
-            self.driver.get(base_url)
-            WebDriverWait(self.driver, 10).until(
+            driver = pool.acquire()
+        except Exception as e:
+            self.log(f"Could not start a browser for {base_url}: {str(e)}")
+            return urls_info
+            
+        try:
+            driver.get(base_url)
+            WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.TAG_NAME, "a"))
             )
             
-            links = self.driver.find_elements(By.TAG_NAME, "a")
+            try:
+                links = self.extract_links(driver)
+            except Exception as e:
+                self.log(f"Batch link extraction failed, falling back to per-link lookups: {str(e)}")
+                links = None
+                
+            if links is not None:
+                return self.filter_links(links)
+                
+            links = driver.find_elements(By.TAG_NAME, "a")
             
             for link in links:
-                if not self.gui.running:
+                if not self.running:
                     break
                 try:
                     href = link.get_attribute('href')
                     if href and (href.startswith('http://') or href.startswith('https://')):
                         title = link.text.strip() or link.get_attribute('title') or 'No Title'
-                        xpath = self.get_xpath(link)
-                        css_selector = self.get_css_selector(link)
+                        xpath = self.get_xpath(driver, link)
+                        css_selector = self.get_css_selector(driver, link)
                         urls_info.append((href, title, xpath, css_selector))
                 except Exception as e:
-                    self.gui.log(f"Error processing link: {str(e)}")
+                    self.log(f"Error processing link: {str(e)}")
                     continue
         except Exception as e:
-            self.gui.log(f"Error during URL collection: {str(e)}")
+            self.log(f"Error during URL collection: {str(e)}")
         finally:
-            self.driver.quit()
-            self.driver = None
+            pool.release(driver)
         
         return urls_info
 
-    def run(self, base_url):
+    def order_by_host(self, urls_info):
+        queues = {}
+        for info in urls_info:
+            queues.setdefault(urlparse(info[0]).netloc.lower(), []).append(info)
+            
+        ordered = []
+        queues = list(queues.values())
+        for index in range(max((len(queue) for queue in queues), default=0)):
+            ordered.extend(queue[index] for queue in queues if index < len(queue))
+        return ordered
+
+    def group_links(self, urls_info):
+        groups = {}
+        for info in urls_info:
+            groups.setdefault(self.normalize_url(info[0]), []).append(info)
+        return {group[0]: group[1:] for group in groups.values()}
+
+    def expand_result(self, result, info):
+        url, title, xpath, css_selector = info[:4]
+        self.count_result(result['status'].lower())
+        expanded = dict(result, url=url, path=self.get_path_from_url(url), title=title, xpath=xpath, css_selector=css_selector)
+        if len(info) > 4:
+            expanded['source'] = info[4]
+        return expanded
+
+    def check_urls(self, urls_info):
+        if self.session is None:
+            self.session = self.create_session()
+            
+        groups = self.group_links(urls_info)
+        if len(groups) < len(urls_info):
+            self.log(f"Checking {len(groups)} unique targets for {len(urls_info)} links")
+            
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = {executor.submit(self.check_url, *info): groups[info] for info in self.order_by_host(list(groups))}
+            for future in as_completed(futures):
+                result = future.result()
+                yield result
+                for info in futures[future]:
+                    yield self.expand_result(result, info)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def is_tracking_parameter(self, name):
+        name = name.lower()
+        return name in TRACKING_PARAMETERS or name.startswith(TRACKING_PREFIXES)
+
+    def normalize_url(self, url):
+        parsed = urlparse(urldefrag(url)[0])
+        scheme = parsed.scheme.lower()
+        userinfo, _, host = parsed.netloc.rpartition('@')
+        host = host.lower()
+        if scheme in DEFAULT_PORTS and host.endswith(f":{DEFAULT_PORTS[scheme]}"):
+            host = host.rsplit(':', 1)[0]
+        path = parsed.path.rstrip('/') or '/'
+        query = '&'.join(
+            pair for pair in parsed.query.split('&')
+            if pair and not self.is_tracking_parameter(pair.split('=', 1)[0])
+        )
+        return parsed._replace(scheme=scheme, netloc=f"{userinfo}@{host}" if userinfo else host, path=path, query=query).geturl()
+
+    def url_key(self, url):
+        return hashlib.blake2b(self.normalize_url(url).encode('utf-8', 'surrogatepass'), digest_size=12).digest()
+
+    def get_robots(self, url):
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        with self.host_lock:
+            parser = self.robots.get(origin)
+        if parser is not None:
+            return parser
+            
+        parser = RobotFileParser(origin + '/robots.txt')
+        try:
+            response = self.session.get(origin + '/robots.txt', timeout=self.timeout, verify=True)
+            if response.status_code in (401, 403):
+                parser.disallow_all = True
+            elif response.status_code >= 400:
+                parser.allow_all = True
+            else:
+                parser.parse(response.text.splitlines())
+        except requests.RequestException:
+            parser.allow_all = True
+        with self.host_lock:
+            return self.robots.setdefault(origin, parser)
+
+    def robots_allowed(self, url):
+        if not self.respect_robots:
+            return True
+        return self.get_robots(url).can_fetch(self.get_headers()['User-Agent'], url)
+
+    def wait_for_host(self, url):
+        delay = self.crawl_delay
+        if self.respect_robots:
+            parsed = urlparse(url)
+            parser = self.robots.get(f"{parsed.scheme}://{parsed.netloc}")
+            if parser is not None:
+                delay = max(delay, parser.crawl_delay(self.get_headers()['User-Agent']) or 0)
+        if not delay:
+            return
+            
+        host = urlparse(url).netloc.lower()
+        with self.host_lock:
+            now = time.monotonic()
+            start = max(now, self.host_next.get(host, 0))
+            self.host_next[host] = start + delay
+        time.sleep(start - now)
+
+    def crawl_page(self, url, title, xpath, css_selector, source):
+        if not self.robots_allowed(url):
+            self.log(f"Skipping {url} (disallowed by robots.txt)")
+            return None, []
+            
+        self.wait_for_host(url)
+        links = []
+        
+        def fetch(timeout):
+            nonlocal links
+            response = self.session.get(url, allow_redirects=True, timeout=timeout, verify=True, stream=True)
+            if response.status_code < 400 and 'html' in response.headers.get('Content-Type', '').lower():
+                links = self.extract_static_links(self.read_page(response), response.url)
+            response.close()
+            return response
+            
+        try:
+            response = self.request_with_retries(url, fetch)
+            status_code = response.status_code
+        except requests.RequestException:
+            status_code = None
+        return self.make_result(url, status_code, title, xpath, css_selector, source), links
+
+    def crawl_task(self, url, title, xpath, css_selector, source, is_page):
+        if is_page:
+            return self.crawl_page(url, title, xpath, css_selector, source)
+        self.wait_for_host(url)
+        return self.check_url(url, title, xpath, css_selector, source), []
+
+    def crawl_urls(self, base_url):
+        if self.session is None:
+            self.session = self.create_session()
+        self.base_url = base_url
+        self.robots = {}
+        self.host_next = {}
+        site = urlparse(base_url).netloc.lower()
+        seen = set()
+        frontier = deque()
+        page_frontier = deque()
+        page_depths = {}
+        pages = 0
+        fetched = 0
+        
+        def enqueue(url, title, xpath, css_selector, source, depth):
+            nonlocal pages
+            key = self.url_key(url)
+            if key in seen:
+                return
+            seen.add(key)
+            is_page = urlparse(url).netloc.lower() == site and depth <= self.crawl_depth and pages < self.max_pages
+            pages += is_page
+            (page_frontier if is_page else frontier).append((url, title, xpath, css_selector, source, depth, is_page))
+            with self.stats_lock:
+                self.stats['total'] += 1
+                
+        def submit(task):
+            url, title, xpath, css_selector, source, _, is_page = task
+            pending[executor.submit(self.crawl_task, url, title, xpath, css_selector, source, is_page)] = task
+            
+        self.log(f"Crawling {base_url} (depth {self.crawl_depth}, up to {self.max_pages} pages)")
+        enqueue(base_url, 'Base URL', 'N/A', 'N/A', '', 0)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = {}
+        try:
+            while frontier or page_frontier or pending:
+                while page_frontier and len(pending) < self.max_workers * 2:
+                    depth = page_frontier[0][5]
+                    if any(page_depth < depth for page_depth, count in page_depths.items() if count):
+                        break
+                    page_depths[depth] = page_depths.get(depth, 0) + 1
+                    submit(page_frontier.popleft())
+                while frontier and len(pending) < self.max_workers * 2:
+                    submit(frontier.popleft())
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url, _, _, _, _, depth, is_page = pending.pop(future)
+                    if is_page:
+                        page_depths[depth] -= 1
+                    result, links = future.result()
+                    if result is None:
+                        pages -= 1
+                        with self.stats_lock:
+                            self.stats['total'] -= 1
+                        continue
+                    fetched += is_page
+                    for href, title, xpath, css_selector in self.filter_links(links):
+                        enqueue(href, title, xpath, css_selector, url, depth + 1)
+                    yield result
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.log(f"Crawl finished: {fetched} pages fetched, {len(seen)} unique URLs")
+
+    def run(self, base_urls):
         self.results = []
         self.stats = {'valid': 0, 'invalid': 0, 'undetectable': 0, 'total': 0}
+        self.host_policies = {}
+        self.base_url = base_urls[0]
+        completed = False
+        pool = self.create_driver_pool()
+        with self.host_lock:
+            self.driver_pool = pool
+            
+        try:
+            self.load_cache()
+            for result in self.check_sites(base_urls):
+                if not self.running:
+                    break
+                self.results.append(result)
+                if self.on_result is not None:
+                    self.on_result(result)
+            completed = self.running
+            self.log("Scraping completed" if completed else "Scraping stopped by user")
+        except Exception as e:
+            self.log(f"Scraping failed: {str(e)}")
+            raise
+        finally:
+            self.close_drivers(pool)
+            self.save_cache()
+            if self.on_finish is not None:
+                self.on_finish(completed)
+
+
+class URLCheckerCLI:
+    RESULT_FIELDS = ['timestamp', 'status', 'code', 'url', 'path', 'title', 'xpath', 'css_selector', 'source', 'cache']
+
+    def build_parser(self):
+        parser = argparse.ArgumentParser(
+            prog="url_checker.py",
+            description="Check the links of one or more sites without the GUI and stream the results as NDJSON or CSV. "
+                        "Exits with status 1 when an invalid link is found. Run without arguments to open the GUI.")
+        parser.add_argument("urls", nargs="*", help="base URLs to check")
+        parser.add_argument("-i", "--input", action="append", default=[],
+                            help="file with one base URL per line ('-' for stdin), may be repeated")
+        parser.add_argument("-f", "--format", default="ndjson", choices=["ndjson", "csv"], help="output format")
+        parser.add_argument("-o", "--output", help="output file (defaults to stdout)")
+        parser.add_argument("-d", "--depth", type=int, default=0, help="crawl same-site pages up to this depth")
+        parser.add_argument("--max-pages", type=int, default=1000, help="stop crawling a site after this many pages")
+        parser.add_argument("--crawl-delay", type=float, default=0.0, help="seconds between requests to the same host")
+        parser.add_argument("--ignore-robots", action="store_true", help="do not honor robots.txt while crawling")
+        parser.add_argument("-m", "--mode", default="auto", choices=["auto", "static", "browser"],
+                            help="how links are collected from each base URL")
+        parser.add_argument("-b", "--browsers", type=int, default=2,
+                            help="Chrome instances rendering JavaScript pages in parallel")
+        parser.add_argument("--browser-recycle", type=int, default=50, metavar="PAGES",
+                            help="restart each Chrome instance after this many pages")
+        parser.add_argument("-w", "--workers", type=int, default=16, help="concurrent link checks")
+        parser.add_argument("--per-host", type=int, default=4, help="concurrent link checks per host")
+        parser.add_argument("-t", "--timeout", type=float, default=10, help="request timeout in seconds")
+        parser.add_argument("--cache", help="link cache file reused between runs")
+        parser.add_argument("--cache-ttl", type=float, default=24, help="hours before a cached link is checked again")
+        parser.add_argument("-q", "--quiet", action="store_true", help="only log warnings and errors")
+        return parser
+
+    def read_urls(self, args):
+        urls = list(args.urls)
+        for path in args.input:
+            source = sys.stdin if path == "-" else open(path, 'r', encoding='utf-8')
+            try:
+                urls.extend(line.strip() for line in source if line.strip() and not line.lstrip().startswith('#'))
+            finally:
+                if source is not sys.stdin:
+                    source.close()
+        return list(dict.fromkeys(urls))
+
+    def run(self, argv=None):
+        parser = self.build_parser()
+        args = parser.parse_args(argv)
+        logging.basicConfig(
+            level=logging.WARNING if args.quiet else logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s',
+            stream=sys.stderr
+        )
         
-        urls_info = self.collect_urls(base_url)
-        self.stats['total'] = len(urls_info)
+        try:
+            base_urls = self.read_urls(args)
+        except OSError as e:
+            parser.error(str(e))
+        if not base_urls:
+            parser.error("no base URLs given, pass them as arguments or with --input")
+        invalid = [url for url in base_urls if not url.startswith(('http://', 'https://'))]
+        if invalid:
+            parser.error(f"not an http(s) URL: {invalid[0]}")
+            
+        checker = URLChecker(max_workers=args.workers, per_host_limit=args.per_host, timeout=args.timeout,
+                             collection_mode=args.mode, cache_file=args.cache, cache_ttl=args.cache_ttl * 3600)
+        checker.crawl_depth = args.depth
+        checker.max_pages = args.max_pages
+        checker.crawl_delay = args.crawl_delay
+        checker.respect_robots = not args.ignore_robots
+        checker.max_drivers = max(1, args.browsers)
+        checker.driver_max_pages = max(1, args.browser_recycle)
         
-        for idx, (url, title, xpath, css_selector) in enumerate(urls_info, 1):
-            if not self.gui.running:
-                break
-            result = self.check_url(url, title, xpath, css_selector)
-            self.results.append(result)
-            self.gui.after(0, self.gui.append_result, idx, result)
-            self.gui.after(0, self.gui.status_bar.configure, 
-                         {"text": f"Checking - Valid: {self.stats['valid']} | Invalid: {self.stats['invalid']} | Undetectable: {self.stats['undetectable']}"})
-            
-        if self.gui.running:
-            self.gui.log("Scraping completed")
-            self.gui.after(0, self.gui.status_bar.configure, 
-                         {"text": f"Completed - Valid: {self.stats['valid']} | Invalid: {self.stats['invalid']} | Undetectable: {self.stats['undetectable']}"})
-            self.gui.after(0, self.gui.start_btn.configure, {"state": "normal"})
-            self.gui.after(0, self.gui.stop_btn.configure, {"state": "disabled"})
-            self.gui.after(0, self.gui.export_btn.configure, {"state": "normal"})
-            self.gui.after(0, self.gui.loader.stop)
-            self.gui.after(0, self.gui.loader.pack_forget)
-        else:
-            self.gui.log("Scraping stopped by user")
-            self.gui.after(0, self.gui.status_bar.configure, {"text": "Scraping stopped"})
-            self.gui.after(0, self.gui.loader.stop)
-            self.gui.after(0, self.gui.loader.pack_forget)
+        output = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+        try:
+            if args.format == "csv":
+                writer = csv.DictWriter(output, fieldnames=self.RESULT_FIELDS, extrasaction='ignore')
+                writer.writeheader()
+                write = writer.writerow
+            else:
+                write = lambda result: output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                
+            def on_result(result):
+                write(result)
+                output.flush()
+                
+            checker.on_result = on_result
+            try:
+                checker.run(base_urls)
+            except KeyboardInterrupt:
+                checker.running = False
+                logger.warning("Interrupted, partial results were written")
+                return 130
+        finally:
+            if output is not sys.stdout:
+                output.close()
+                
+        stats = checker.stats
+        logger.info(f"{len(checker.results)} links on {len(base_urls)} sites - Valid: {stats['valid']} | "
+                    f"Invalid: {stats['invalid']} | Undetectable: {stats['undetectable']}")
+        return 1 if stats['invalid'] else 0
 
 if __name__ == "__main__":
-    ctk.set_appearance_mode("dark")
-    ctk.set_default_color_theme("blue")
-    app = URLCheckerGUI()
-    app.mainloop()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        sys.exit(URLCheckerCLI().run())
+    run_gui()
\ No newline at end of file